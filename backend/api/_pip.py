@@ -0,0 +1,67 @@
+"""Shared pip subprocess runner for the engine install and CUDA fix endpoints."""
+
+import asyncio
+import sys
+import time
+
+# pip output is coalesced into one WebSocket message per batch of lines or interval
+PROGRESS_BATCH_LINES = 16
+PROGRESS_BATCH_INTERVAL = 0.1
+
+# Output is read in large blocks and split locally rather than one readline per line
+READ_CHUNK_SIZE = 64 * 1024
+STREAM_LIMIT = 1 << 20
+
+
+async def run_pip(args: list[str], ws_manager, engine_name: str) -> tuple[int, list[str]]:
+    """Run a pip command, streaming output via WebSocket. Returns (exit_code, output_lines)."""
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "pip", *args,
+        "--no-input",
+        # Skips pip's own PyPI round-trip to check for a newer pip
+        "--disable-pip-version-check",
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+        limit=STREAM_LIMIT,
+    )
+
+    output_lines: list[str] = []
+    batch: list[str] = []
+    last_flush = time.monotonic()
+
+    async def flush() -> None:
+        nonlocal last_flush
+        if batch:
+            await ws_manager.broadcast({
+                "type": "install_progress",
+                "engine": engine_name,
+                "stage": "installing",
+                "message": batch[-1],
+                "lines": batch.copy(),
+            })
+            batch.clear()
+        last_flush = time.monotonic()
+
+    async def emit(lines: list[bytes]) -> None:
+        for line in lines:
+            text = line.decode("utf-8", errors="replace").strip()
+            if text:
+                output_lines.append(text)
+                batch.append(text)
+        if len(batch) >= PROGRESS_BATCH_LINES or time.monotonic() - last_flush >= PROGRESS_BATCH_INTERVAL:
+            await flush()
+
+    buf = b""
+    while True:
+        chunk = await proc.stdout.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        buf += chunk
+        *lines, buf = buf.split(b"\n")
+        await emit(lines)
+
+    # Trailing output without a final newline
+    await emit([buf])
+    await flush()
+    await proc.wait()
+    return proc.returncode, output_lines
@@ -1,15 +1,21 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Body, HTTPException, Query
+from fastapi.responses import FileResponse, ORJSONResponse
 
 from config import settings
 from services.audio_processing import AudioProcessor
+from services.op_cache import OpCache
 from utils.logging_config import get_logger
 
 logger = get_logger("api.audio")
 
-router = APIRouter(prefix="/audio", tags=["audio"])
+router = APIRouter(prefix="/audio", tags=["audio"], default_response_class=ORJSONResponse)
+
+op_cache = OpCache(settings.cache_dir, int(settings.op_cache_gb * 1024 ** 3))
 
 MEDIA_TYPES = {
     ".wav": "audio/wav",
@@ -18,32 +24,52 @@ MEDIA_TYPES = {
     ".ogg": "audio/ogg",
 }
 
+# Output files are named by date + random id and never rewritten in place,
+# so browsers may cache them indefinitely
+AUDIO_CACHE_HEADERS = {"Cache-Control": "public, max-age=31536000, immutable"}
+
+# ffmpeg and libsndfile release the GIL, so threads give real parallelism
+# here without spawning Python worker processes
+_CONVERT_POOL = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="convert")
+
+# Resolved once -- outputs_dir does not move while the server is running.
+# Kept as plain strings so the per-request path checks stay in os.path
+_OUTPUTS_STR = str(settings.outputs_dir)
+_OUTPUTS_ROOT = os.path.realpath(_OUTPUTS_STR) + os.sep
 
-def _resolve_audio_path(date: str, filename: str) -> Path:
+
+def _resolve_audio_path(date: str, filename: str) -> str:
     """Resolve and validate audio file path, preventing path traversal."""
     for part in (date, filename):
         if ".." in part or "/" in part or "\\" in part:
             logger.warning(f"Path traversal attempt blocked: date={date!r} filename={filename!r}")
             raise HTTPException(status_code=400, detail="Invalid path")
 
-    path = (settings.outputs_dir / date / filename).resolve()
+    real = os.path.realpath(os.path.join(_OUTPUTS_STR, date, filename))
 
-    if not str(path).startswith(str(settings.outputs_dir.resolve())):
-        logger.warning(f"Path escaped outputs_dir: {path}")
+    if not real.startswith(_OUTPUTS_ROOT):
+        logger.warning(f"Path escaped outputs_dir: {real}")
         raise HTTPException(status_code=403, detail="Access denied")
 
-    if not path.exists():
+    try:
+        os.stat(real)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Audio file not found")
 
-    return path
+    return real
 
 
 @router.get("/{date}/{filename}")
 async def serve_audio(date: str, filename: str):
-    path = _resolve_audio_path(date, filename)
-    media_type = MEDIA_TYPES.get(path.suffix.lower(), "application/octet-stream")
-    logger.debug(f"Serving audio: {path.name} ({media_type})")
-    return FileResponse(str(path), media_type=media_type, filename=filename)
+    real = _resolve_audio_path(date, filename)
+    media_type = MEDIA_TYPES.get(os.path.splitext(real)[1].lower(), "application/octet-stream")
+    logger.debug(f"Serving audio: {filename} ({media_type})")
+    return FileResponse(
+        real,
+        media_type=media_type,
+        filename=filename,
+        headers=AUDIO_CACHE_HEADERS,
+    )
 
 
 @router.get("/{date}/{filename}/export")
@@ -53,16 +79,24 @@ async def export_audio(
     format: str = Query("wav", pattern="^(wav|mp3|flac|ogg)$"),
 ):
     """Export audio in a specific format."""
-    source = _resolve_audio_path(date, filename)
+    source = Path(_resolve_audio_path(date, filename))
 
+    media_type = MEDIA_TYPES.get(f".{format}", "application/octet-stream")
     if source.suffix.lstrip(".") == format:
-        media_type = MEDIA_TYPES.get(f".{format}", "application/octet-stream")
         return FileResponse(str(source), media_type=media_type, filename=filename)
 
+    target = source.with_suffix(f".{format}")
+    key = op_cache.key(source, "convert", format=format)
+    if op_cache.fetch(key, target):
+        return FileResponse(str(target), media_type=media_type, filename=target.name)
+
     logger.info(f"Converting {source.name} to {format}")
     try:
-        converted = AudioProcessor.convert_format(source, format)
-        media_type = MEDIA_TYPES.get(f".{format}", "application/octet-stream")
+        loop = asyncio.get_running_loop()
+        converted = await loop.run_in_executor(
+            _CONVERT_POOL, AudioProcessor.convert_format, source, format,
+        )
+        op_cache.store(key, converted)
         logger.debug(f"Conversion complete: {converted.name}")
         return FileResponse(
             str(converted),
@@ -74,13 +108,62 @@ async def export_audio(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/export-batch")
+async def export_audio_batch(
+    files: list[str] = Body(..., embed=True),
+    format: str = Body("mp3", pattern="^(wav|mp3|flac|ogg)$"),
+):
+    """Export several audio files ("date/filename") in one format.
+
+    Cached conversions are reused; the rest are encoded concurrently.
+    Returns the exported files' URLs in request order.
+    """
+    sources: list[tuple[str, Path]] = []
+    for item in files:
+        date, _, filename = item.partition("/")
+        sources.append((date, Path(_resolve_audio_path(date, filename))))
+
+    results: dict[Path, Path] = {}
+    pending: dict[Path, str] = {}
+    for _date, source in sources:
+        if source in results or source in pending:
+            continue
+        if source.suffix.lstrip(".") == format:
+            results[source] = source
+            continue
+        key = op_cache.key(source, "convert", format=format)
+        if op_cache.fetch(key, source.with_suffix(f".{format}")):
+            results[source] = source.with_suffix(f".{format}")
+        else:
+            pending[source] = key
+
+    if pending:
+        logger.info(f"Batch export: {len(pending)} of {len(files)} files need converting to {format}")
+        try:
+            converted = await AudioProcessor.convert_format_batch_async(list(pending), format)
+        except RuntimeError as e:
+            logger.error(f"Batch format conversion failed: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+        for (source, key), output in zip(pending.items(), converted):
+            op_cache.store(key, output)
+            results[source] = output
+
+    return {"files": [f"/api/audio/{date}/{results[source].name}" for date, source in sources]}
+
+
 @router.post("/{date}/{filename}/normalize")
 async def normalize_audio(date: str, filename: str):
     """Normalize audio loudness."""
-    source = _resolve_audio_path(date, filename)
+    source = Path(_resolve_audio_path(date, filename))
+    target = source.with_stem(source.stem + "_normalized")
+    key = op_cache.key(source, "normalize")
+    if op_cache.fetch(key, target):
+        return {"audio_url": f"/api/audio/{date}/{target.name}"}
+
     logger.info(f"Normalizing: {source.name}")
     try:
         result = AudioProcessor.normalize_audio(source)
+        op_cache.store(key, result)
         logger.debug(f"Normalized output: {result.name}")
         return {"audio_url": f"/api/audio/{date}/{result.name}"}
     except Exception as e:
@@ -91,10 +174,18 @@ async def normalize_audio(date: str, filename: str):
 @router.post("/{date}/{filename}/trim")
 async def trim_silence(date: str, filename: str):
     """Trim leading/trailing silence."""
-    source = _resolve_audio_path(date, filename)
+    source = Path(_resolve_audio_path(date, filename))
+    target = source.with_stem(source.stem + "_trimmed")
+    key = op_cache.key(source, "trim")
+    if op_cache.fetch(key, target):
+        return {"audio_url": f"/api/audio/{date}/{target.name}"}
+
     logger.info(f"Trimming silence: {source.name}")
     try:
         result = AudioProcessor.trim_silence(source)
+        # An all-silent file comes back unchanged; nothing to cache
+        if result != source:
+            op_cache.store(key, result)
         logger.debug(f"Trimmed output: {result.name}")
         return {"audio_url": f"/api/audio/{date}/{result.name}"}
     except Exception as e:
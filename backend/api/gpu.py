@@ -1,8 +1,12 @@
 import asyncio
-import sys
+import atexit
+import time
+from typing import Optional
 
 from fastapi import APIRouter, HTTPException
 
+from api._pip import run_pip
+from utils.io_pool import run_io
 from utils.logging_config import get_logger
 
 logger = get_logger("api.gpu")
@@ -10,78 +14,80 @@ logger = get_logger("api.gpu")
 router = APIRouter(prefix="/gpu", tags=["gpu"])
 
 
-@router.get("/status")
-async def gpu_status():
-    """Get detailed GPU status: memory usage, temperature, utilization."""
-    try:
-        import pynvml
-        pynvml.nvmlInit()
-        handle = pynvml.nvmlDeviceGetHandleByIndex(0)
+# Concurrent pollers within this window share one NVML query
+_STATUS_TTL = 0.25
 
-        mem_info = pynvml.nvmlDeviceGetMemoryInfo(handle)
-        utilization = pynvml.nvmlDeviceGetUtilizationRates(handle)
+_nvml_handle = None
+_nvml_name: Optional[str] = None
+_status_cache: Optional[tuple[float, dict]] = None
+_status_lock = asyncio.Lock()
 
-        try:
-            temp = pynvml.nvmlDeviceGetTemperature(handle, pynvml.NVML_TEMPERATURE_GPU)
-        except Exception:
-            temp = None
 
+def _nvml_device():
+    """Initialise NVML once per process and return (handle, name) for GPU 0."""
+    global _nvml_handle, _nvml_name
+    if _nvml_handle is None:
+        import pynvml
+        pynvml.nvmlInit()
+        handle = pynvml.nvmlDeviceGetHandleByIndex(0)
         name = pynvml.nvmlDeviceGetName(handle)
         if isinstance(name, bytes):
             name = name.decode()
+        atexit.register(pynvml.nvmlShutdown)
+        _nvml_handle, _nvml_name = handle, name
+    return _nvml_handle, _nvml_name
 
-        pynvml.nvmlShutdown()
 
-        logger.debug(
-            f"GPU status: {name}, "
-            f"VRAM {mem_info.used / 1024**3:.1f}/{mem_info.total / 1024**3:.1f}GB, "
-            f"util={utilization.gpu}%, temp={temp}C"
-        )
-
-        return {
-            "available": True,
-            "name": name,
-            "memory_total_gb": round(mem_info.total / 1024**3, 1),
-            "memory_used_gb": round(mem_info.used / 1024**3, 1),
-            "memory_free_gb": round(mem_info.free / 1024**3, 1),
-            "memory_percent": round(mem_info.used / mem_info.total * 100, 1),
-            "gpu_utilization": utilization.gpu,
-            "temperature_c": temp,
-        }
-    except ImportError:
-        logger.debug("pynvml not installed, GPU monitoring unavailable")
-        return {"available": False, "error": "pynvml not installed"}
-    except Exception as e:
-        logger.warning(f"GPU monitoring failed: {e}")
-        return {"available": False, "error": str(e)}
+def _collect_gpu_status() -> dict:
+    import pynvml
+    handle, name = _nvml_device()
 
+    mem_info = pynvml.nvmlDeviceGetMemoryInfo(handle)
+    utilization = pynvml.nvmlDeviceGetUtilizationRates(handle)
 
-async def _run_pip_cuda(args: list[str], ws_manager) -> tuple[int, list[str]]:
-    """Run a pip command for CUDA fix, streaming output via WebSocket."""
-    proc = await asyncio.create_subprocess_exec(
-        sys.executable, "-m", "pip", *args,
-        "--no-input",
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.STDOUT,
+    try:
+        temp = pynvml.nvmlDeviceGetTemperature(handle, pynvml.NVML_TEMPERATURE_GPU)
+    except Exception:
+        temp = None
+
+    logger.debug(
+        f"GPU status: {name}, "
+        f"VRAM {mem_info.used / 1024**3:.1f}/{mem_info.total / 1024**3:.1f}GB, "
+        f"util={utilization.gpu}%, temp={temp}C"
     )
 
-    output_lines: list[str] = []
-    while True:
-        line = await proc.stdout.readline()
-        if not line:
-            break
-        text = line.decode("utf-8", errors="replace").strip()
-        if text:
-            output_lines.append(text)
-            await ws_manager.broadcast({
-                "type": "install_progress",
-                "engine": "cuda",
-                "stage": "installing",
-                "message": text,
-            })
+    return {
+        "available": True,
+        "name": name,
+        "memory_total_gb": round(mem_info.total / 1024**3, 1),
+        "memory_used_gb": round(mem_info.used / 1024**3, 1),
+        "memory_free_gb": round(mem_info.free / 1024**3, 1),
+        "memory_percent": round(mem_info.used / mem_info.total * 100, 1),
+        "gpu_utilization": utilization.gpu,
+        "temperature_c": temp,
+    }
 
-    await proc.wait()
-    return proc.returncode, output_lines
+
+@router.get("/status")
+async def gpu_status():
+    """Get detailed GPU status: memory usage, temperature, utilization."""
+    global _status_cache
+    async with _status_lock:
+        now = time.monotonic()
+        if _status_cache and now - _status_cache[0] < _STATUS_TTL:
+            return _status_cache[1]
+
+        try:
+            status = await run_io(_collect_gpu_status)
+        except ImportError:
+            logger.debug("pynvml not installed, GPU monitoring unavailable")
+            status = {"available": False, "error": "pynvml not installed"}
+        except Exception as e:
+            logger.warning(f"GPU monitoring failed: {e}")
+            status = {"available": False, "error": str(e)}
+
+        _status_cache = (now, status)
+        return status
 
 
 @router.post("/fix-cuda")
@@ -91,6 +97,13 @@ async def fix_cuda():
 
     if torch.cuda.is_available():
         return {"status": "ok", "message": "CUDA is already available"}
+    if torch.version.cuda:
+        # A CUDA build that can't see a GPU is a driver problem; reinstalling won't help
+        logger.info(f"torch is already a CUDA {torch.version.cuda} build, skipping reinstall")
+        return {
+            "status": "ok",
+            "message": f"PyTorch already has CUDA {torch.version.cuda} support. Check the NVIDIA driver.",
+        }
 
     from api.ws import ws_manager
 
@@ -111,9 +124,9 @@ async def fix_cuda():
             "stage": "installing",
             "message": "Removing CPU-only PyTorch...",
         })
-        rc, _ = await _run_pip_cuda(
+        rc, _ = await run_pip(
             ["uninstall", "torch", "torchaudio", "-y"],
-            ws_manager,
+            ws_manager, "cuda",
         )
         if rc != 0:
             logger.warning("torch uninstall returned non-zero, continuing anyway")
@@ -125,9 +138,9 @@ async def fix_cuda():
             "stage": "installing",
             "message": "Downloading PyTorch with CUDA 12.1 (this may take a few minutes)...",
         })
-        rc, output_lines = await _run_pip_cuda(
+        rc, output_lines = await run_pip(
             ["install", "torch", "torchaudio", "--index-url", "https://download.pytorch.org/whl/cu121", "--no-cache-dir"],
-            ws_manager,
+            ws_manager, "cuda",
         )
 
         if rc == 0:
@@ -1,10 +1,11 @@
 """Serves preview audio files generated by Parler-TTS."""
 
-from pathlib import Path
+import os
 
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import FileResponse
 
+from api.audio import AUDIO_CACHE_HEADERS
 from config import settings
 from utils.logging_config import get_logger
 
@@ -12,6 +13,10 @@ logger = get_logger("api.previews")
 
 router = APIRouter(prefix="/previews", tags=["previews"])
 
+# Resolved once -- previews_dir does not move while the server is running
+_PREVIEWS_STR = str(settings.previews_dir)
+_PREVIEWS_ROOT = os.path.realpath(_PREVIEWS_STR) + os.sep
+
 
 @router.get("/{date}/{filename}")
 async def serve_preview(date: str, filename: str):
@@ -20,12 +25,15 @@ async def serve_preview(date: str, filename: str):
         if ".." in part or "/" in part or "\\" in part:
             raise HTTPException(status_code=400, detail="Invalid path")
 
-    path = (settings.previews_dir / date / filename).resolve()
+    real = os.path.realpath(os.path.join(_PREVIEWS_STR, date, filename))
 
-    if not str(path).startswith(str(settings.previews_dir.resolve())):
+    if not real.startswith(_PREVIEWS_ROOT):
         raise HTTPException(status_code=403, detail="Access denied")
 
-    if not path.exists():
+    try:
+        os.stat(real)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Preview audio not found")
 
-    return FileResponse(str(path), media_type="audio/wav", filename=filename)
+    # Preview names carry a fresh uuid, so a URL always means the same bytes
+    return FileResponse(real, media_type="audio/wav", filename=filename, headers=AUDIO_CACHE_HEADERS)
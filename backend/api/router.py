@@ -1,6 +1,6 @@
+import functools
 import os
 
-import torch
 from fastapi import APIRouter
 from fastapi.responses import JSONResponse
 
@@ -26,17 +26,24 @@ api_router.include_router(previews_router)
 api_router.include_router(ws_router)
 api_router.include_router(gpu_router)
 
+@functools.lru_cache(maxsize=1)
+def _gpu_state() -> dict:
+    """CUDA availability never changes while the process runs, so query it once."""
+    import torch
+
+    try:
+        gpu_available = torch.cuda.is_available()
+        gpu_name = torch.cuda.get_device_name(0) if gpu_available else None
+    except Exception as e:
+        logger.warning(f"CUDA query failed: {e}")
+        gpu_available, gpu_name = False, None
+    logger.debug(f"GPU state: gpu={gpu_available}, name={gpu_name}")
+    return {"gpu_available": gpu_available, "gpu_name": gpu_name}
+
 
 @api_router.get("/health")
 async def health_check():
-    gpu_available = torch.cuda.is_available()
-    gpu_name = torch.cuda.get_device_name(0) if gpu_available else None
-    logger.debug(f"Health check: gpu={gpu_available}, name={gpu_name}")
-    return {
-        "status": "ok",
-        "gpu_available": gpu_available,
-        "gpu_name": gpu_name,
-    }
+    return {"status": "ok", **_gpu_state()}
 
 
 @api_router.post("/restart")
@@ -1,14 +1,16 @@
-import asyncio
-import sys
+import importlib.util
+from importlib.metadata import PackageNotFoundError, version
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Body, HTTPException
+from fastapi.responses import ORJSONResponse
 
+from api._pip import run_pip
 from engines.engine_manager import engine_manager
 from utils.logging_config import get_logger
 
 logger = get_logger("api.tts")
 
-router = APIRouter(prefix="/tts", tags=["tts"])
+router = APIRouter(prefix="/tts", tags=["tts"], default_response_class=ORJSONResponse)
 
 # Pip install commands per engine (and parler-tts)
 INSTALL_COMMANDS: dict[str, list[str]] = {
@@ -18,12 +20,23 @@ INSTALL_COMMANDS: dict[str, list[str]] = {
     "parler-tts": ["parler-tts"],
 }
 
+# Top-level module each engine's packages provide, used to skip pip entirely
+INSTALL_MODULES: dict[str, str] = {
+    "kokoro": "kokoro",
+    "fish-speech": "fish_speech",
+    "f5-tts": "f5_tts",
+    "parler-tts": "parler_tts",
+}
+
+# pip 23.2+ replaces in-use files via rename on Windows, so upgrading first is moot
+PIP_MIN_VERSION = (23, 2)
+
 
 @router.get("/engines")
 async def list_engines():
     engines = engine_manager.get_available_engines()
     logger.debug(f"Listed {len(engines)} engines")
-    return engines
+    return ORJSONResponse(engines)
 
 
 @router.get("/engines/{name}/voices")
@@ -32,53 +45,62 @@ async def list_engine_voices(name: str):
         engine = engine_manager.get_engine(name)
         voices = engine.get_available_voices()
         logger.debug(f"Engine '{name}' has {len(voices)} voices")
-        return voices
+        return ORJSONResponse(voices)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 
-async def _run_pip(args: list[str], ws_manager, engine_name: str) -> tuple[int, list[str]]:
-    """Run a pip command, streaming output via WebSocket. Returns (exit_code, output_lines)."""
-    proc = await asyncio.create_subprocess_exec(
-        sys.executable, "-m", "pip", *args,
-        "--no-input",
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.STDOUT,
-    )
-
-    output_lines: list[str] = []
-    while True:
-        line = await proc.stdout.readline()
-        if not line:
-            break
-        text = line.decode("utf-8", errors="replace").strip()
-        if text:
-            output_lines.append(text)
-            await ws_manager.broadcast({
-                "type": "install_progress",
-                "engine": engine_name,
-                "stage": "installing",
-                "message": text,
-            })
+def _pip_is_current() -> bool:
+    """True if the installed pip already has the Windows rename-on-upgrade handling."""
+    try:
+        major, minor = version("pip").split(".")[:2]
+        return (int(major), int(minor)) >= PIP_MIN_VERSION
+    except (PackageNotFoundError, ValueError):
+        return False
+
 
-    await proc.wait()
-    return proc.returncode, output_lines
+def _is_installed(name: str) -> bool:
+    module = INSTALL_MODULES.get(name)
+    return module is not None and importlib.util.find_spec(module) is not None
 
 
 @router.post("/engines/install/{name}")
 async def install_engine(name: str):
-    """Install an engine's pip packages and broadcast progress via WebSocket.
+    """Install an engine's pip packages and broadcast progress via WebSocket."""
+    packages = INSTALL_COMMANDS.get(name)
+    if not packages:
+        raise HTTPException(status_code=404, detail=f"Unknown package: {name}")
+    if _is_installed(name):
+        logger.info(f"'{name}' is already installed, skipping pip")
+        return {"status": "ok", "engine": name, "message": "Already installed"}
+    return await _install_packages(name, packages)
+
+
+@router.post("/engines/install")
+async def install_engines(names: list[str] = Body(...)):
+    """Install several engines in a single pip run so the resolver only runs once."""
+    if not names:
+        raise HTTPException(status_code=422, detail="No packages given to install")
+    unknown = [n for n in names if n not in INSTALL_COMMANDS]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown package: {', '.join(unknown)}")
+    missing = [n for n in names if not _is_installed(n)]
+    if not missing:
+        return {"status": "ok", "engine": ",".join(names), "message": "Already installed"}
+    names = missing
+    packages = list(dict.fromkeys(p for n in names for p in INSTALL_COMMANDS[n]))
+    return await _install_packages(",".join(names), packages)
+
+
+async def _install_packages(name: str, packages: list[str]) -> dict:
+    """Install pip packages on behalf of name, broadcasting progress via WebSocket.
 
     On Windows, locked .pyd files can cause "Access is denied" errors when pip
     tries to upgrade in-use packages.  We handle this by:
-      1. Upgrading pip itself first (modern pip uses rename-tricks on Windows)
+      1. Upgrading pip itself first if it predates the rename-tricks on Windows
       2. Attempting the install
       3. On permission failure, retrying without upgrading existing deps
     """
-    packages = INSTALL_COMMANDS.get(name)
-    if not packages:
-        raise HTTPException(status_code=404, detail=f"Unknown package: {name}")
-
     from api.ws import ws_manager
 
     logger.info(f"Installing packages for '{name}': {packages}")
@@ -92,15 +114,18 @@ async def install_engine(name: str):
 
     try:
         # Step 1: Upgrade pip (old pip is much worse at handling locked files on Windows)
-        await ws_manager.broadcast({
-            "type": "install_progress",
-            "engine": name,
-            "stage": "installing",
-            "message": "Upgrading pip...",
-        })
-        rc, _ = await _run_pip(["install", "--upgrade", "pip"], ws_manager, name)
-        if rc != 0:
-            logger.warning("pip upgrade failed, continuing anyway")
+        if _pip_is_current():
+            logger.debug(f"pip {version('pip')} is recent enough, skipping upgrade")
+        else:
+            await ws_manager.broadcast({
+                "type": "install_progress",
+                "engine": name,
+                "stage": "installing",
+                "message": "Upgrading pip...",
+            })
+            rc, _ = await run_pip(["install", "--upgrade", "pip"], ws_manager, name)
+            if rc != 0:
+                logger.warning("pip upgrade failed, continuing anyway")
 
         # Step 2: Install the packages
         await ws_manager.broadcast({
@@ -109,8 +134,8 @@ async def install_engine(name: str):
             "stage": "installing",
             "message": f"Installing {name}...",
         })
-        rc, output_lines = await _run_pip(
-            ["install", *packages, "--no-cache-dir"],
+        rc, output_lines = await run_pip(
+            ["install", *packages, "--no-cache-dir", "--prefer-binary"],
             ws_manager, name,
         )
 
@@ -131,8 +156,8 @@ async def install_engine(name: str):
                     "stage": "installing",
                     "message": "Locked files detected, retrying without upgrading existing packages...",
                 })
-                rc, output_lines = await _run_pip(
-                    ["install", *packages, "--no-cache-dir", "--no-deps"],
+                rc, output_lines = await run_pip(
+                    ["install", *packages, "--no-cache-dir", "--prefer-binary", "--no-deps"],
                     ws_manager, name,
                 )
 
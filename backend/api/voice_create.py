@@ -3,6 +3,7 @@
 Handles creating voices from text prompts (Parler-TTS) and audio references.
 """
 
+import os
 import shutil
 import uuid
 from datetime import datetime
@@ -14,12 +15,19 @@ from config import settings
 from engines.base import VoiceProfile
 from services.parler_service import ParlerVoiceService, GenerationCancelled
 from services.voice_library import VoiceLibrary
+from utils.io_pool import run_io
 from utils.logging_config import get_logger
 
 logger = get_logger("api.voice_create")
 
 router = APIRouter(prefix="/voices/create", tags=["voice-create"])
 
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# previews_dir does not move while the server runs; resolve it once
+_PREVIEWS_STR = str(settings.previews_dir)
+_PREVIEWS_ROOT = os.path.realpath(_PREVIEWS_STR) + os.sep
+
 voice_library = VoiceLibrary(settings.voices_dir)
 parler_service = ParlerVoiceService(
     previews_dir=settings.previews_dir,
@@ -27,6 +35,13 @@ parler_service = ParlerVoiceService(
 )
 
 
+def _write_upload(src, dest: Path) -> int:
+    """Copy an upload's spooled file to dest in chunks; returns bytes written."""
+    with open(dest, "wb") as out:
+        shutil.copyfileobj(src, out, UPLOAD_CHUNK_SIZE)
+        return out.tell()
+
+
 @router.get("/parler-status")
 async def parler_status():
     """Check if Parler-TTS is installed and available."""
@@ -44,6 +59,7 @@ async def preview_from_prompt(
     sample_text: str = Form("Hello, this is a preview of my custom voice. I hope you like how it sounds."),
     model_id: str = Form("parler-mini-v1.1"),
     temperature: float = Form(1.0),
+    normalize: bool = Form(False),
 ):
     """Generate a preview audio from a voice description using Parler-TTS.
 
@@ -63,6 +79,7 @@ async def preview_from_prompt(
             sample_text=sample_text,
             model_id=model_id,
             temperature=temperature,
+            normalize=normalize,
             request=request,
         )
     except GenerationCancelled:
@@ -84,6 +101,54 @@ async def preview_from_prompt(
     }
 
 
+@router.post("/preview-batch-from-prompt")
+async def preview_batch_from_prompt(
+    request: Request,
+    descriptions: list[str] = Form(...),
+    sample_text: str = Form("Hello, this is a preview of my custom voice. I hope you like how it sounds."),
+    model_id: str = Form("parler-mini-v1.1"),
+    temperature: float = Form(1.0),
+    normalize: bool = Form(False),
+):
+    """Generate previews for several voice descriptions in batched Parler-TTS calls.
+
+    Does NOT save voice profiles. Previews are returned in request order.
+    """
+    if not parler_service.is_available():
+        raise HTTPException(
+            status_code=400,
+            detail="Parler-TTS is not installed. Run: pip install parler-tts",
+        )
+
+    logger.info(f"Batch preview from prompt [{model_id}]: {len(descriptions)} descriptions (temp={temperature})")
+
+    try:
+        previews = await parler_service.generate_previews_batch(
+            [(description, sample_text) for description in descriptions],
+            model_id=model_id,
+            temperature=temperature,
+            normalize=normalize,
+            request=request,
+        )
+    except GenerationCancelled:
+        logger.info("Generation cancelled (client disconnected)")
+        raise HTTPException(status_code=499, detail="Generation cancelled")
+    except Exception as e:
+        logger.error(f"Batch preview generation failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Preview generation failed: {e}")
+
+    return {
+        "previews": [
+            {
+                "audio_url": f"/api/previews/{audio_path.parent.name}/{audio_path.name}",
+                "duration": duration,
+            }
+            for audio_path, duration in previews
+        ],
+        "model_id": model_id,
+    }
+
+
 @router.post("/save-from-prompt")
 async def save_from_prompt(
     name: str = Form(...),
@@ -111,11 +176,11 @@ async def save_from_prompt(
         if ".." in part or "/" in part or "\\" in part:
             raise HTTPException(status_code=400, detail="Invalid audio URL")
 
-    preview_path = (settings.previews_dir / date_part / file_part).resolve()
-    if not str(preview_path).startswith(str(settings.previews_dir.resolve())):
+    preview_path = os.path.realpath(os.path.join(_PREVIEWS_STR, date_part, file_part))
+    if not preview_path.startswith(_PREVIEWS_ROOT):
         raise HTTPException(status_code=403, detail="Access denied")
 
-    if not preview_path.exists():
+    if not os.path.exists(preview_path):
         raise HTTPException(status_code=404, detail="Preview audio not found. Generate a preview first.")
 
     # Create voice profile
@@ -123,9 +188,13 @@ async def save_from_prompt(
     voice_dir = settings.voices_dir / voice_id
     voice_dir.mkdir(parents=True, exist_ok=True)
 
-    # Copy preview audio as reference
+    # Hardlink the preview as the reference (previews are never rewritten, so
+    # sharing the inode is safe); copy when on another volume or unsupported
     ref_path = voice_dir / "reference.wav"
-    shutil.copy2(str(preview_path), str(ref_path))
+    try:
+        os.link(preview_path, ref_path)
+    except OSError:
+        await run_io(shutil.copy2, preview_path, str(ref_path))
 
     profile = VoiceProfile(
         id=voice_id,
@@ -163,9 +232,8 @@ async def create_from_audio(
 
     # Save uploaded audio as reference
     ref_path = voice_dir / "reference.wav"
-    content = await audio.read()
-    ref_path.write_bytes(content)
-    logger.debug(f"Saved reference audio: {ref_path} ({len(content)} bytes)")
+    size = await run_io(_write_upload, audio.file, ref_path)
+    logger.debug(f"Saved reference audio: {ref_path} ({size} bytes)")
 
     profile = VoiceProfile(
         id=voice_id,
@@ -1,38 +1,105 @@
 import json
-import re
 import uuid
 import zipfile
-from io import BytesIO
 from pathlib import Path
+from typing import Iterator
 
 from fastapi import APIRouter, HTTPException, File, UploadFile
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import FileResponse, ORJSONResponse, Response, StreamingResponse
 
+from api.audio import AUDIO_CACHE_HEADERS
 from config import settings
 from engines.base import VoiceProfile
 from services.voice_library import VoiceLibrary
+from utils.io_pool import run_io
 from utils.logging_config import get_logger
 
 logger = get_logger("api.voices")
 
-router = APIRouter(prefix="/voices", tags=["voices"])
+router = APIRouter(prefix="/voices", tags=["voices"], default_response_class=ORJSONResponse)
 
 voice_library = VoiceLibrary(settings.voices_dir)
 
-_UUID_RE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$")
+# (library mtime, encoded JSON body) of the last list_voices response
+_list_cache: tuple[int, bytes] | None = None
+
+CHUNK_SIZE = 64 * 1024
+
+# Already-compressed or PCM payloads gain little from deflate; store them as-is
+_STORED_SUFFIXES = {".wav", ".flac", ".mp3", ".ogg"}
+
+
+class _ZipStreamBuffer:
+    """Write-only sink for zipfile that hands back bytes as they are produced."""
+
+    def __init__(self):
+        self._buf = bytearray()
+        self._pos = 0
+
+    def write(self, data: bytes) -> int:
+        self._buf += data
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = bytes(self._buf)
+        self._buf.clear()
+        return data
+
+
+def _iter_voice_zip(voice_dir: Path) -> Iterator[bytes]:
+    """Yield a zip archive of voice_dir chunk by chunk.
+
+    Runs as a sync generator, so StreamingResponse iterates it in a worker
+    thread and compression never blocks the event loop.
+    """
+    buf = _ZipStreamBuffer()
+    with zipfile.ZipFile(buf, "w") as zf:
+        for file_path in sorted(voice_dir.iterdir()):
+            if not file_path.is_file():
+                continue
+            zinfo = zipfile.ZipInfo.from_file(file_path, file_path.name)
+            if file_path.suffix.lower() in _STORED_SUFFIXES:
+                zinfo.compress_type = zipfile.ZIP_STORED
+            else:
+                zinfo.compress_type = zipfile.ZIP_DEFLATED
+            with open(file_path, "rb") as src, zf.open(zinfo, "w") as dst:
+                while chunk := src.read(CHUNK_SIZE):
+                    dst.write(chunk)
+                    if data := buf.drain():
+                        yield data
+    # Remaining local data plus the central directory written on close
+    yield buf.drain()
 
 
 def _validate_voice_id(voice_id: str) -> None:
     """Validate that voice_id is a UUID to prevent path traversal."""
-    if not _UUID_RE.match(voice_id):
+    # uuid.UUID also accepts braces, urn: prefixes and uppercase, so require
+    # the canonical lowercase form the library stores voices under
+    try:
+        valid = str(uuid.UUID(voice_id)) == voice_id
+    except ValueError:
+        valid = False
+    if not valid:
         raise HTTPException(status_code=400, detail="Invalid voice ID")
 
 
 @router.get("")
 async def list_voices():
-    voices = voice_library.list_voices()
-    logger.debug(f"Listed {len(voices)} voices")
-    return [v.to_dict() for v in voices]
+    global _list_cache
+    # Read the stamp before listing so a change mid-scan forces a re-list next time
+    stamp = voice_library.mtime()
+    if _list_cache is None or _list_cache[0] != stamp:
+        voices = voice_library.list_voices()
+        _list_cache = (stamp, b"[" + b",".join(v.json_bytes for v in voices) + b"]")
+        logger.debug(f"Listed {len(voices)} voices")
+    return Response(content=_list_cache[1], media_type="application/json")
 
 
 @router.get("/{voice_id}")
@@ -41,7 +108,7 @@ async def get_voice(voice_id: str):
     voice = voice_library.get_voice(voice_id)
     if not voice:
         raise HTTPException(status_code=404, detail="Voice not found")
-    return voice.to_dict()
+    return Response(content=voice.json_bytes, media_type="application/json")
 
 
 @router.delete("/{voice_id}")
@@ -66,7 +133,8 @@ async def get_voice_audio(voice_id: str):
     if not ref_path.exists():
         raise HTTPException(status_code=404, detail="Reference audio not found")
 
-    return FileResponse(str(ref_path), media_type="audio/wav")
+    # reference.wav is written once per voice ID (imports get a fresh ID)
+    return FileResponse(str(ref_path), media_type="audio/wav", headers=AUDIO_CACHE_HEADERS)
 
 
 @router.get("/{voice_id}/export")
@@ -80,57 +148,55 @@ async def export_voice(voice_id: str):
     if not voice_dir.exists():
         raise HTTPException(status_code=404, detail="Voice directory not found")
 
-    buf = BytesIO()
-    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
-        for file_path in voice_dir.iterdir():
-            if file_path.is_file():
-                zf.write(file_path, file_path.name)
-
-    buf.seek(0)
     safe_name = voice.name.replace(" ", "_").replace("/", "_")
     logger.info(f"Exported voice: {voice.name} (id={voice_id})")
 
     return StreamingResponse(
-        buf,
+        _iter_voice_zip(voice_dir),
         media_type="application/zip",
         headers={"Content-Disposition": f'attachment; filename="{safe_name}.zip"'},
     )
 
 
-@router.post("/import")
-async def import_voice(file: UploadFile = File(...)):
-    if not file.filename or not file.filename.endswith(".zip"):
-        raise HTTPException(status_code=400, detail="Please upload a .zip file")
-
-    content = await file.read()
-    logger.info(f"Import request: {file.filename} ({len(content)} bytes)")
-
+def _extract_voice_archive(archive) -> dict:
+    """Unpack a voice zip into a new voice directory and return its re-keyed metadata."""
     try:
-        zf = zipfile.ZipFile(BytesIO(content))
+        zf = zipfile.ZipFile(archive)
     except zipfile.BadZipFile:
         raise HTTPException(status_code=400, detail="Invalid zip file")
 
-    if "metadata.json" not in zf.namelist():
-        raise HTTPException(status_code=400, detail="Invalid voice archive: missing metadata.json")
+    with zf:
+        names = zf.namelist()
+        if "metadata.json" not in names:
+            raise HTTPException(status_code=400, detail="Invalid voice archive: missing metadata.json")
 
-    # Read and update metadata with new ID
-    meta_raw = json.loads(zf.read("metadata.json"))
-    new_id = str(uuid.uuid4())
-    meta_raw["id"] = new_id
+        # Read and update metadata with new ID
+        meta_raw = json.loads(zf.read("metadata.json"))
+        new_id = str(uuid.uuid4())
+        meta_raw["id"] = new_id
 
-    # Extract to new voice directory
-    voice_dir = settings.voices_dir / new_id
-    voice_dir.mkdir(parents=True, exist_ok=True)
+        # Extract to new voice directory
+        voice_dir = settings.voices_dir / new_id
+        voice_dir.mkdir(parents=True, exist_ok=True)
+        zf.extractall(voice_dir, members=[n for n in names if n != "metadata.json"])
 
-    for name in zf.namelist():
-        if name == "metadata.json":
-            continue
-        zf.extract(name, voice_dir)
+    return meta_raw
 
-    # Save updated metadata
-    with open(voice_dir / "metadata.json", "w") as f:
-        json.dump(meta_raw, f, indent=2)
 
-    profile = VoiceProfile.load(voice_dir / "metadata.json")
-    logger.info(f"Imported voice: {profile.name} (id={new_id})")
+@router.post("/import")
+async def import_voice(file: UploadFile = File(...)):
+    if not file.filename or not file.filename.endswith(".zip"):
+        raise HTTPException(status_code=400, detail="Please upload a .zip file")
+
+    logger.info(f"Import request: {file.filename} ({file.size} bytes)")
+
+    # The multipart parser already spooled the upload to a seekable temp file,
+    # so ZipFile can read it in place without another copy
+    file.file.seek(0)
+    meta_raw = await run_io(_extract_voice_archive, file.file)
+
+    # Save updated metadata
+    profile = VoiceProfile.from_dict(meta_raw)
+    voice_library.save_voice(profile)
+    logger.info(f"Imported voice: {profile.name} (id={profile.id})")
     return profile.to_dict()
@@ -1,3 +1,6 @@
+import asyncio
+
+import orjson
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
 from utils.logging_config import get_logger
@@ -9,27 +12,30 @@ router = APIRouter(tags=["websocket"])
 
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: list[WebSocket] = []
+        self.active_connections: set[WebSocket] = set()
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections.add(websocket)
         logger.info(f"WebSocket connected ({len(self.active_connections)} active)")
 
     def disconnect(self, websocket: WebSocket):
         if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+            self.active_connections.discard(websocket)
             logger.info(f"WebSocket disconnected ({len(self.active_connections)} active)")
 
     async def broadcast(self, message: dict):
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception:
-                disconnected.append(connection)
-        for conn in disconnected:
-            self.disconnect(conn)
+        # Encode once for all clients; sent as text so the frontend's JSON.parse still works
+        payload = orjson.dumps(message).decode()
+        # Snapshot: connects/disconnects may land while the sends are in flight
+        connections = list(self.active_connections)
+        results = await asyncio.gather(
+            *(conn.send_text(payload) for conn in connections),
+            return_exceptions=True,
+        )
+        for conn, result in zip(connections, results):
+            if isinstance(result, Exception):
+                self.disconnect(conn)
         if self.active_connections:
             logger.debug(f"Broadcast to {len(self.active_connections)} clients: {message.get('type', 'unknown')}")
 
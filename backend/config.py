@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Optional
 
 import torch
 
@@ -19,11 +20,37 @@ class Settings:
     voices_dir: Path = data_dir / "voices"
     outputs_dir: Path = data_dir / "outputs"
     previews_dir: Path = data_dir / "previews"
+    cache_dir: Path = data_dir / "cache"
     logs_dir: Path = data_dir / "logs"
 
     # Device
     device: str = "cuda" if torch.cuda.is_available() else "cpu"
 
+    # Seconds an idle engine stays loaded after its last generation.
+    # -1 keeps it loaded until switched; 0 unloads as soon as generation ends
+    engine_keep_alive: float = 300.0
+    # Load every installed engine that fits in VRAM at startup. Off by default:
+    # the API routes don't generate through EngineManager yet, so preloaded
+    # engines would only hold VRAM
+    preload_engines: bool = False
+    # Host RAM kept for unloaded engine weights, pinned (page-locked).
+    # None sizes it to a quarter of physical RAM (needs psutil); 0 disables the tier
+    ram_cache_gb: Optional[float] = None
+    # Disk space for cached convert/normalize/trim results (data/cache),
+    # least recently used evicted first
+    op_cache_gb: float = 2.0
+    # Parler-TTS weight dtype on GPU: "auto" (bf16 where supported, else fp16),
+    # "bf16", "fp16" or "fp32" (full precision, for debugging)
+    parler_precision: str = "auto"
+    # torch.compile Parler-TTS's decoder with a static KV cache (GPU only).
+    # Off by default: previews unload the model after each run, and a cold
+    # load pays the compile and warm-up, which outweighs the faster decode
+    # unless many previews follow one another
+    parler_compile: bool = False
+    # Parler-TTS decoder weight quantization on GPU: "none" or "int8"
+    # (weight-only via torchao; activations stay in parler_precision)
+    parler_quant: str = "none"
+
     def ensure_directories(self):
         for d in [
             self.data_dir,
@@ -31,6 +58,7 @@ class Settings:
             self.voices_dir,
             self.outputs_dir,
             self.previews_dir,
+            self.cache_dir,
             self.logs_dir,
         ]:
             d.mkdir(parents=True, exist_ok=True)
@@ -1,11 +1,18 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional, Callable
-import json
+import hashlib
+import itertools
+import os
+import secrets
+import time
+from datetime import datetime
 
+import orjson
 
-@dataclass
+
+@dataclass(slots=True)
 class VoiceProfile:
     id: str
     name: str
@@ -16,23 +23,42 @@ class VoiceProfile:
     created_at: str = ""
     source: str = "audio"  # "audio" | "prompt"
     description: Optional[str] = None  # Text description for prompt-created voices
+    # Encoded form, filled by json_bytes and cleared on save()
+    _json: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+
+    def _fields(self) -> dict:
+        # Shallow view of the persisted fields; skips asdict()'s deep copy
+        return {name: getattr(self, name) for name in _PROFILE_FIELDS}
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        data = self._fields()
+        data["settings"] = dict(self.settings)
+        return data
+
+    @property
+    def json_bytes(self) -> bytes:
+        """Encoded to_dict(), computed once per profile and dropped on save()."""
+        if self._json is None:
+            self._json = orjson.dumps(self._fields())
+        return self._json
 
     @classmethod
     def from_dict(cls, data: dict) -> "VoiceProfile":
-        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+        return cls(**{k: v for k, v in data.items() if k in _PROFILE_FIELDS})
 
     def save(self, path: Path):
-        path.write_text(json.dumps(self.to_dict(), indent=2))
+        self._json = None
+        path.write_bytes(orjson.dumps(self._fields(), option=orjson.OPT_INDENT_2))
 
     @classmethod
     def load(cls, path: Path) -> "VoiceProfile":
-        return cls.from_dict(json.loads(path.read_text()))
+        return cls.from_dict(orjson.loads(path.read_bytes()))
+
 
+_PROFILE_FIELDS = tuple(name for name in VoiceProfile.__dataclass_fields__ if not name.startswith("_"))
 
-@dataclass
+
+@dataclass(slots=True)
 class GenerationRequest:
     text: str
     voice: Optional[VoiceProfile] = None
@@ -41,9 +67,10 @@ class GenerationRequest:
     temperature: float = 0.7
     seed: Optional[int] = None
     output_format: str = "wav"
+    keep_alive: Optional[float] = None  # seconds; None uses settings.engine_keep_alive
 
 
-@dataclass
+@dataclass(slots=True)
 class GenerationResult:
     audio_path: Path
     sample_rate: int
@@ -54,6 +81,111 @@ class GenerationResult:
 ProgressCallback = Callable[[float, str], None]
 
 
+class _DebouncedProgress:
+    """Wraps a ProgressCallback, dropping updates within min_interval of the last one.
+
+    Completion (progress >= 1.0) is always delivered, so fine-grained
+    per-segment reporting can't flood WebSocket clients.
+    """
+
+    __slots__ = ("_callback", "_min_interval", "_last_emit")
+
+    def __init__(self, callback: ProgressCallback, min_interval: float = 0.05):
+        self._callback = callback
+        self._min_interval = min_interval
+        self._last_emit = float("-inf")
+
+    def __call__(self, progress: float, message: str) -> None:
+        now = time.monotonic()
+        if progress < 1.0 and now - self._last_emit < self._min_interval:
+            return
+        self._last_emit = now
+        self._callback(progress, message)
+
+
+# Output file ids: a per-process counter hashed with a random salt, so ids stay
+# unpredictable and unique across restarts without reading urandom per file
+_file_counter = itertools.count()
+_file_salt = secrets.token_bytes(8)
+
+
+def _new_file_id() -> str:
+    """An 8-hex-char id for a generated output file."""
+    n = next(_file_counter)
+    return hashlib.blake2b(n.to_bytes(8, "little"), digest_size=4, key=_file_salt).hexdigest()
+
+
+# (expires_at, output dir) per outputs root; re-checked at most once a minute
+_DATE_DIR_TTL = 60.0
+_date_dir_cache: dict[Path, tuple[float, Path]] = {}
+
+
+def _today_output_dir(outputs_dir: Path) -> Path:
+    """outputs_dir/YYYYMMDD for today, created on first use.
+
+    Caches the dated path for a minute so generations skip the strftime and
+    mkdir on every request.
+    """
+    now = time.time()
+    cached = _date_dir_cache.get(outputs_dir)
+    if cached is not None and now < cached[0]:
+        return cached[1]
+    output_dir = outputs_dir / datetime.now().strftime("%Y%m%d")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    _date_dir_cache[outputs_dir] = (now + _DATE_DIR_TTL, output_dir)
+    return output_dir
+
+
+# Parsed metadata.json per voice, keyed by path and reused while its mtime holds
+_voice_meta_cache: dict[str, tuple[int, dict]] = {}
+# Voice names grouped by engine, per voices_dir, valid while the dir mtime holds
+_voices_by_engine: dict[str, tuple[int, dict[str, list[str]]]] = {}
+
+
+def _scan_voices_by_engine(voices_dir: Path) -> dict[str, list[str]]:
+    """Saved voice names grouped by their engine field.
+
+    One scandir pass over voices_dir serves every engine. The grouping is
+    cached on the directory's mtime alone, so it is only redone when entries
+    are added, removed or renamed -- which includes VoiceLibrary rewriting
+    index.json on every save/delete. A metadata.json edited in place by
+    anything else is not seen until then. During a rescan, each
+    metadata.json is only parsed again when its own mtime changed.
+    """
+    key = str(voices_dir)
+    try:
+        dir_mtime = os.stat(key).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    cached_group = _voices_by_engine.get(key)
+    if cached_group is not None and cached_group[0] == dir_mtime:
+        return cached_group[1]
+
+    grouped: dict[str, list[str]] = {}
+    for entry in os.scandir(key):
+        if not entry.is_dir():
+            continue
+        meta_path = os.path.join(entry.path, "metadata.json")
+        try:
+            mtime = os.stat(meta_path).st_mtime_ns
+        except FileNotFoundError:
+            continue
+        cached = _voice_meta_cache.get(meta_path)
+        if cached is None or cached[0] != mtime:
+            with open(meta_path, "rb") as f:
+                cached = (mtime, orjson.loads(f.read()))
+            _voice_meta_cache[meta_path] = cached
+        meta = cached[1]
+        grouped.setdefault(meta.get("engine"), []).append(meta["name"])
+    _voices_by_engine[key] = (dir_mtime, grouped)
+    return grouped
+
+
+def _scan_voices(voices_dir: Path, engine_name: str) -> list[str]:
+    """Names of the saved voices belonging to engine_name."""
+    return list(_scan_voices_by_engine(voices_dir).get(engine_name, []))
+
+
 class TTSEngine(ABC):
     """Abstract base class for all TTS engines."""
 
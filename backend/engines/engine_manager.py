@@ -1,18 +1,64 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
-from .base import TTSEngine
+import torch
+
+from .base import TTSEngine, GenerationRequest, GenerationResult, ProgressCallback, _scan_voices_by_engine
+from config import settings
 from utils.logging_config import get_logger
 
 logger = get_logger("engines.manager")
 
+# Headroom over an engine's advertised VRAM before it may load alongside others
+VRAM_HEADROOM = 1.15
+
+# Engines run their blocking work here rather than in asyncio's default
+# executor, which FastAPI shares for sync handlers and file I/O. Inference is
+# serialized on one thread -- a single GPU runs one generation at a time
+# anyway. Loads and unloads get their own small pool so a startup preload can
+# still overlap and a load never queues behind a long generation.
+INFERENCE_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts-infer")
+LOAD_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tts-load")
+
+# Startup preloading only kicks in with at least this much free VRAM
+PRELOAD_MIN_FREE_BYTES = 8 << 30
+
+
+def _free_vram_bytes() -> Optional[int]:
+    """Free bytes on the CUDA device, or None when there is no GPU to budget."""
+    try:
+        if not torch.cuda.is_available():
+            return None
+        free, _total = torch.cuda.mem_get_info(0)
+        return free
+    except Exception as e:
+        logger.warning(f"VRAM query failed: {e}")
+        return None
+
 
 class EngineManager:
-    """Registry of TTS engines. Handles loading, unloading, and switching."""
+    """Registry of TTS engines. Handles loading, unloading, and switching.
+
+    Several engines may stay resident while VRAM allows; one of them is the
+    active engine. Residents are evicted least-recently-used first.
+    """
 
     def __init__(self):
         self._engines: dict[str, TTSEngine] = {}
+        self._loaded: dict[str, TTSEngine] = {}
         self._active_engine: Optional[TTSEngine] = None
         self._active_name: Optional[str] = None
+        # Idle auto-unload: the watchdog frees VRAM once a resident engine has
+        # gone its keep_alive seconds without a generate() call. Per-engine
+        # overrides come from request.keep_alive and last until it unloads.
+        self._last_used: dict[str, float] = {}
+        self._keep_alive: dict[str, float] = {}
+        self._in_flight: dict[str, int] = {}
+        self._watchdog: Optional[asyncio.Task] = None
+        # In-progress loads, shared so a request can join a startup preload
+        self._loading: dict[str, asyncio.Task] = {}
 
     def register(self, engine: TTSEngine) -> None:
         name = engine.get_name()
@@ -35,37 +81,184 @@ class EngineManager:
                 "supports_emotion": engine.supports_emotion_control(),
                 "required_vram_gb": engine.get_required_vram_gb(),
                 "builtin_voices": engine.get_available_voices(),
-                "loaded": name == self._active_name,
+                "loaded": name in self._loaded,
+                "active": name == self._active_name,
             })
         return result
 
+    def list_voices_by_engine(self) -> dict[str, list[str]]:
+        """Saved voice names for every engine from a single directory scan."""
+        return {name: list(voices) for name, voices in _scan_voices_by_engine(settings.voices_dir).items()}
+
     async def activate_engine(self, name: str) -> TTSEngine:
         if name == self._active_name and self._active_engine:
             logger.debug(f"Engine '{name}' already active")
             return self._active_engine
 
-        # Unload current engine first
-        if self._active_engine:
-            logger.info(f"Unloading engine: {self._active_name}")
-            await self._active_engine.unload_model()
-            self._active_engine = None
-            self._active_name = None
+        engine = self._loaded.get(name)
+        if engine:
+            logger.info(f"Switching to resident engine: {name}")
+        elif name in self._loading:
+            logger.info(f"Waiting for engine '{name}' to finish loading")
+            engine = await self._load(name)
+        else:
+            await self._make_room(self.get_engine(name).get_required_vram_gb() * 1024 ** 3)
+            engine = await self._load(name)
 
-        engine = self.get_engine(name)
-        logger.info(f"Loading engine: {name}")
-        await engine.load_model()
         self._active_engine = engine
         self._active_name = name
+        self._last_used[name] = time.monotonic()
+        self._start_watchdog()
         logger.info(f"Engine '{name}' activated")
         return engine
 
-    async def deactivate(self) -> None:
-        """Unload the active engine and clear state."""
-        if self._active_engine:
-            logger.info(f"Deactivating engine: {self._active_name}")
-            await self._active_engine.unload_model()
+    async def _load(self, name: str) -> TTSEngine:
+        """Load name as a resident engine, joining a load already in progress."""
+        task = self._loading.get(name)
+        if task is None:
+            task = asyncio.create_task(self._load_now(name))
+            self._loading[name] = task
+            task.add_done_callback(lambda _t: self._loading.pop(name, None))
+        return await task
+
+    async def _load_now(self, name: str) -> TTSEngine:
+        engine = self.get_engine(name)
+        logger.info(f"Loading engine: {name}")
+        await engine.load_model()
+        self._loaded[name] = engine
+        self._last_used[name] = time.monotonic()
+        self._start_watchdog()
+        return engine
+
+    async def preload(self) -> list[str]:
+        """Load every installed engine that fits in free VRAM, concurrently.
+
+        Each load_model runs its weight loading in the executor, so the loads
+        overlap and finish in roughly the time of the largest. Preloaded
+        engines are resident but not active, and idle out like any other.
+        """
+        free = _free_vram_bytes()
+        if free is None or free < PRELOAD_MIN_FREE_BYTES:
+            logger.debug("Skipping engine preload: not enough free VRAM")
+            return []
+
+        picked = []
+        budget = free
+        for name, engine in sorted(self._engines.items(), key=lambda kv: kv[1].get_required_vram_gb()):
+            need = engine.get_required_vram_gb() * 1024 ** 3 * VRAM_HEADROOM
+            if name in self._loaded or need > budget or not engine.is_available():
+                continue
+            picked.append(name)
+            budget -= need
+        if not picked:
+            return []
+
+        logger.info(f"Preloading engines: {', '.join(picked)}")
+        results = await asyncio.gather(*(self._load(name) for name in picked), return_exceptions=True)
+        loaded = []
+        for name, result in zip(picked, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Preloading '{name}' failed: {result}")
+            else:
+                loaded.append(name)
+        return loaded
+
+    async def _make_room(self, required_bytes: float) -> None:
+        """Evict resident engines, least recently used first, until required_bytes fit."""
+        while self._loaded:
+            free = _free_vram_bytes()
+            # Without a GPU to budget against, keep the one-resident behavior
+            if free is not None and free >= required_bytes * VRAM_HEADROOM:
+                return
+            idle = [n for n in self._loaded if not self._in_flight.get(n)]
+            if not idle:
+                logger.warning("All resident engines are busy; loading without eviction")
+                return
+            await self._unload(min(idle, key=lambda n: self._last_used.get(n, 0.0)))
+
+    async def _unload(self, name: str) -> None:
+        engine = self._loaded.pop(name)
+        self._last_used.pop(name, None)
+        self._keep_alive.pop(name, None)
+        if name == self._active_name:
             self._active_engine = None
             self._active_name = None
+        logger.info(f"Unloading engine: {name}")
+        await engine.unload_model()
+
+    async def generate(
+        self,
+        name: str,
+        request: GenerationRequest,
+        progress_callback: Optional[ProgressCallback] = None,
+    ) -> GenerationResult:
+        """Activate the named engine, run one generation, and refresh its idle timer.
+
+        request.keep_alive (when set) becomes this engine's idle timeout
+        until it is unloaded; other resident engines keep their own.
+        """
+        if request.keep_alive is not None:
+            self._keep_alive[name] = request.keep_alive
+        engine = await self.activate_engine(name)
+        self._in_flight[name] = self._in_flight.get(name, 0) + 1
+        self._last_used[name] = time.monotonic()
+        try:
+            return await engine.generate(request, progress_callback)
+        finally:
+            self._in_flight[name] -= 1
+            if name in self._loaded:
+                self._last_used[name] = time.monotonic()
+                if self._keep_alive_for(name) == 0 and not self._in_flight[name]:
+                    await self._unload(name)
+
+    def _keep_alive_for(self, name: str) -> float:
+        return self._keep_alive.get(name, settings.engine_keep_alive)
+
+    def _start_watchdog(self) -> None:
+        if self._watchdog is None or self._watchdog.done():
+            self._watchdog = asyncio.create_task(self._idle_watchdog())
+
+    def _stop_watchdog(self) -> None:
+        # Never cancel from inside the watchdog itself (it calls _unload)
+        if self._watchdog and self._watchdog is not asyncio.current_task():
+            self._watchdog.cancel()
+        self._watchdog = None
+
+    async def _idle_watchdog(self) -> None:
+        while self._loaded:
+            now = time.monotonic()
+            # Engines kept loaded indefinitely (-1) are re-checked in case a
+            # later request gives them a finite timeout
+            next_check = 60.0
+            for name in list(self._loaded):
+                keep_alive = self._keep_alive_for(name)
+                if keep_alive < 0 or self._in_flight.get(name):
+                    continue
+                remaining = self._last_used.get(name, now) + keep_alive - now
+                if remaining > 0:
+                    next_check = min(next_check, remaining)
+                    continue
+                logger.info(f"Engine '{name}' idle for {keep_alive:.0f}s, unloading")
+                try:
+                    await self._unload(name)
+                except Exception as e:
+                    logger.warning(f"Idle unload of '{name}' failed: {e}")
+            await asyncio.sleep(max(next_check, 1.0))
+
+    async def deactivate(self) -> None:
+        """Unload every resident engine and clear state.
+
+        Loads still in progress (a startup preload) are waited out first:
+        their weights are already streaming in from an executor thread that
+        can't be interrupted, so they are unloaded once they land instead.
+        """
+        self._stop_watchdog()
+        if self._loading:
+            logger.info(f"Waiting for loads of {', '.join(self._loading)} before deactivating")
+            await asyncio.gather(*self._loading.values(), return_exceptions=True)
+        for name in list(self._loaded):
+            logger.info(f"Deactivating engine: {name}")
+            await self._unload(name)
 
     def get_active_engine(self) -> Optional[TTSEngine]:
         return self._active_engine
@@ -73,5 +266,11 @@ class EngineManager:
     def get_active_name(self) -> Optional[str]:
         return self._active_name
 
+    def get_loaded_names(self) -> list[str]:
+        return list(self._loaded)
+
+    def get_loading_names(self) -> list[str]:
+        return list(self._loading)
+
 
 engine_manager = EngineManager()
@@ -1,5 +1,4 @@
 import asyncio
-import json
 import shutil
 import time
 import uuid
@@ -8,13 +7,57 @@ from pathlib import Path
 from typing import Optional
 
 import numpy as np
-import soundfile as sf
 
-from .base import TTSEngine, GenerationRequest, GenerationResult, VoiceProfile, ProgressCallback
+from .base import TTSEngine, GenerationRequest, GenerationResult, VoiceProfile, ProgressCallback, _DebouncedProgress, _new_file_id, _today_output_dir, _scan_voices
+from .weight_cache import weight_cache, to_device, prefetch_hf_files, cuda_allocated, release_cuda_cache
+from .engine_manager import INFERENCE_EXECUTOR, LOAD_EXECUTOR
+from services.audio_processing import AudioProcessor
+from services.voice_library import VoiceLibrary
 from utils.logging_config import get_logger
 
 logger = get_logger("engines.f5tts")
 
+# Checkpoint F5TTS() downloads for each model name it accepts (f5_tts.api)
+_CHECKPOINTS = {
+    "F5TTS_v1_Base": ("SWivid/F5-TTS", "F5TTS_v1_Base/model_1250000.safetensors"),
+    "F5TTS_Base": ("SWivid/F5-TTS", "F5TTS_Base/model_1200000.safetensors"),
+    "E2TTS_Base": ("SWivid/E2-TTS", "E2TTS_Base/model_1200000.safetensors"),
+}
+# Vocoder loaded for models whose config sets mel_spec_type: vocos
+_VOCOS_FILES = [
+    ("charactr/vocos-mel-24khz", "config.yaml"),
+    ("charactr/vocos-mel-24khz", "pytorch_model.bin"),
+]
+
+
+def _weight_files() -> list[tuple[str, str]]:
+    """Hub files F5TTS() will open for the installed f5_tts's default model.
+
+    The model name comes from F5TTS's own signature and the vocoder from that
+    model's bundled config, so a release defaulting to another checkpoint is
+    never prefetched blind; anything unrecognized is left to F5TTS().
+    """
+    import inspect
+    from importlib.resources import files
+
+    from f5_tts.api import F5TTS
+
+    param = inspect.signature(F5TTS).parameters.get("model")
+    model = param.default if param is not None else None
+    checkpoint = _CHECKPOINTS.get(model)
+    if checkpoint is None:
+        logger.debug(f"No known checkpoint for F5TTS default model {model!r}, not prefetching")
+        return []
+    try:
+        from omegaconf import OmegaConf
+
+        config = OmegaConf.load(str(files("f5_tts").joinpath(f"configs/{model}.yaml")))
+        mel_spec_type = config.model.mel_spec.mel_spec_type
+    except Exception as e:
+        logger.debug(f"Could not read the {model} config, prefetching the checkpoint only: {e}")
+        return [checkpoint]
+    return [checkpoint, *(_VOCOS_FILES if mel_spec_type == "vocos" else [])]
+
 
 class F5TTSEngine(TTSEngine):
     SAMPLE_RATE = 24000
@@ -49,35 +92,44 @@ class F5TTSEngine(TTSEngine):
         return False
 
     def get_available_voices(self) -> list[str]:
-        voices = []
-        if self._voices_dir.exists():
-            for voice_dir in self._voices_dir.iterdir():
-                if voice_dir.is_dir():
-                    meta_path = voice_dir / "metadata.json"
-                    if meta_path.exists():
-                        meta = json.loads(meta_path.read_text())
-                        if meta.get("engine") == "f5-tts":
-                            voices.append(meta["name"])
-        return voices
+        return _scan_voices(self._voices_dir, "f5-tts")
 
     async def load_model(self) -> None:
         logger.info("Loading F5-TTS model...")
         start = time.time()
         loop = asyncio.get_running_loop()
-        await loop.run_in_executor(None, self._load_model_sync)
+        await loop.run_in_executor(LOAD_EXECUTOR, self._load_model_sync)
         self._loaded = True
         logger.info(f"F5-TTS model loaded in {time.time() - start:.1f}s")
 
     def _load_model_sync(self):
+        from config import settings
+        cached = weight_cache.restore(self.get_name(), settings.device)
+        if cached is not None:
+            self._model = cached
+            return
         from f5_tts.api import F5TTS
-        self._model = F5TTS()
+        # Download stage: all checkpoints at once, before F5TTS() asks for
+        # them one by one; then build on the CPU and stream to the GPU
+        prefetch_hf_files(_weight_files())
+        if not settings.device.startswith("cuda"):
+            self._model = F5TTS(device=settings.device)
+            return
+        model = F5TTS(device="cpu")
+        to_device(model, settings.device)
+        model.device = settings.device  # infer() places reference audio here
+        self._model = model
 
     async def unload_model(self) -> None:
-        self._model = None
+        allocated = cuda_allocated()
+        model, self._model = self._model, None
         self._loaded = False
-        import torch
-        if torch.cuda.is_available():
-            torch.cuda.empty_cache()
+        loop = asyncio.get_running_loop()
+        if model is not None:
+            # Park the weights in host RAM so the next load skips the disk
+            await loop.run_in_executor(LOAD_EXECUTOR, weight_cache.offload, self.get_name(), model)
+        del model
+        await loop.run_in_executor(LOAD_EXECUTOR, release_cuda_cache, allocated)
         logger.info("F5-TTS model unloaded")
 
     async def generate(
@@ -88,6 +140,9 @@ class F5TTSEngine(TTSEngine):
         if not self._loaded or not self._model:
             raise RuntimeError("F5-TTS model not loaded")
 
+        if progress_callback:
+            progress_callback = _DebouncedProgress(progress_callback)
+
         logger.info(f"Generating: text_len={len(request.text)}, seed={request.seed}")
         start = time.time()
 
@@ -95,31 +150,30 @@ class F5TTSEngine(TTSEngine):
             progress_callback(0.1, "Starting F5-TTS generation...")
 
         loop = asyncio.get_running_loop()
-        output_path = await loop.run_in_executor(
-            None,
+        output_path, n_samples = await loop.run_in_executor(
+            INFERENCE_EXECUTOR,
             lambda: self._generate_sync(request),
         )
 
         if progress_callback:
             progress_callback(1.0, "Complete")
 
-        info = sf.info(str(output_path))
+        duration = n_samples / self.SAMPLE_RATE
         elapsed = time.time() - start
-        logger.info(f"Generated {info.duration:.1f}s audio in {elapsed:.1f}s -> {output_path.name}")
+        logger.info(f"Generated {duration:.1f}s audio in {elapsed:.1f}s -> {output_path.name}")
 
         return GenerationResult(
             audio_path=output_path,
-            sample_rate=int(info.samplerate),
-            duration_seconds=info.duration,
+            sample_rate=self.SAMPLE_RATE,
+            duration_seconds=duration,
             engine_used="f5-tts",
         )
 
-    def _generate_sync(self, request: GenerationRequest) -> Path:
-        file_id = str(uuid.uuid4())[:8]
-        timestamp = datetime.now().strftime("%Y%m%d")
-        output_dir = self._outputs_dir / timestamp
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = output_dir / f"{file_id}.wav"
+    def _generate_sync(self, request: GenerationRequest) -> tuple[Path, int]:
+        """Run inference and write the output file; returns (output_path, n_samples)."""
+        file_id = _new_file_id()
+        as_mp3 = request.output_format == "mp3"
+        output_path = _today_output_dir(self._outputs_dir) / f"{file_id}.{'mp3' if as_mp3 else 'wav'}"
 
         ref_file = None
         ref_text = ""
@@ -131,11 +185,14 @@ class F5TTSEngine(TTSEngine):
             ref_file=ref_file,
             ref_text=ref_text,
             gen_text=request.text,
-            file_wave=str(output_path),
+            # MP3 is encoded straight from the returned samples, no WAV in between
+            file_wave=None if as_mp3 else str(output_path),
             seed=request.seed if request.seed else -1,
         )
+        if as_mp3:
+            AudioProcessor.convert_array_to_mp3(wav, sr, output_path)
 
-        return output_path
+        return output_path, len(wav)
 
     async def clone_voice(
         self,
@@ -160,6 +217,7 @@ class F5TTSEngine(TTSEngine):
             created_at=datetime.now().isoformat(),
         )
 
-        profile.save(voice_dir / "metadata.json")
+        # Through the library, so the voice lands in its index and list_voices sees it
+        VoiceLibrary(self._voices_dir).save_voice(profile)
         logger.info(f"Cloned voice: {voice_name} (id={voice_id})")
         return profile
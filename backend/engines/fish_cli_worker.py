@@ -0,0 +1,50 @@
+"""Long-lived Fish Speech CLI worker.
+
+Started once by FishSpeechEngine in CLI mode (python -m engines.fish_cli_worker)
+and fed one JSON request per line on stdin:
+
+    {"args": ["--text", "...", "--output", "..."]}   -> {"ok": true}
+    {"cmd": "shutdown"}                              -> exits
+
+Each request runs fish_speech.infer as __main__ with the given argv, so the
+interpreter and everything fish_speech imports (torch included) are loaded
+once instead of once per generation. The module's own prints go to stderr;
+stdout carries only the protocol.
+"""
+
+import contextlib
+import json
+import runpy
+import sys
+
+
+def _run(args: list[str]) -> dict:
+    argv = sys.argv
+    sys.argv = ["fish_speech.infer", *args]
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            runpy.run_module("fish_speech.infer", run_name="__main__", alter_sys=True)
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            return {"ok": False, "error": f"fish_speech.infer exited with {e.code}"}
+    except Exception as e:
+        return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+    finally:
+        sys.argv = argv
+    return {"ok": True}
+
+
+def main() -> None:
+    protocol = sys.stdout
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        if request.get("cmd") == "shutdown":
+            break
+        protocol.write(json.dumps(_run(request["args"])) + "\n")
+        protocol.flush()
+
+
+if __name__ == "__main__":
+    main()
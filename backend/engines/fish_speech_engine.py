@@ -1,6 +1,9 @@
 import asyncio
 import json
 import shutil
+import subprocess
+import sys
+import threading
 import time
 import uuid
 from datetime import datetime
@@ -10,11 +13,18 @@ from typing import Optional
 import numpy as np
 import soundfile as sf
 
-from .base import TTSEngine, GenerationRequest, GenerationResult, VoiceProfile, ProgressCallback
+from .base import TTSEngine, GenerationRequest, GenerationResult, VoiceProfile, ProgressCallback, _DebouncedProgress, _new_file_id, _today_output_dir, _scan_voices
+from .weight_cache import weight_cache, to_device, cuda_allocated, release_cuda_cache
+from .engine_manager import INFERENCE_EXECUTOR, LOAD_EXECUTOR
+from services.audio_processing import AudioProcessor
+from services.voice_library import VoiceLibrary
 from utils.logging_config import get_logger
 
 logger = get_logger("engines.fish_speech")
 
+# Directory the CLI worker runs from so `-m engines.fish_cli_worker` resolves
+_BACKEND_DIR = str(Path(__file__).resolve().parent.parent)
+
 
 EMOTION_PRESETS = {
     "happy": "(happy)",
@@ -37,6 +47,9 @@ EMOTION_PRESETS = {
     "amused": "(amused)",
 }
 
+# Interned so lookups with the (usually interned) request key compare by identity
+EMOTION_PRESETS = {sys.intern(k): sys.intern(v) for k, v in EMOTION_PRESETS.items()}
+
 ALL_EMOTION_MARKERS = [
     "angry", "sad", "excited", "surprised", "satisfied", "delighted",
     "scared", "worried", "upset", "nervous", "frustrated", "depressed",
@@ -62,6 +75,9 @@ class FishSpeechEngine(TTSEngine):
         self._outputs_dir = outputs_dir
         self._model = None
         self._loaded = False
+        # CLI mode: one long-lived worker process instead of a fork per request
+        self._worker: Optional[subprocess.Popen] = None
+        self._worker_lock = threading.Lock()
 
     def get_name(self) -> str:
         return "fish-speech"
@@ -86,41 +102,99 @@ class FishSpeechEngine(TTSEngine):
         return True
 
     def get_available_voices(self) -> list[str]:
-        voices = []
-        if self._voices_dir.exists():
-            for voice_dir in self._voices_dir.iterdir():
-                if voice_dir.is_dir():
-                    meta_path = voice_dir / "metadata.json"
-                    if meta_path.exists():
-                        meta = json.loads(meta_path.read_text())
-                        if meta.get("engine") == "fish-speech":
-                            voices.append(meta["name"])
-        return voices
+        return _scan_voices(self._voices_dir, "fish-speech")
 
     async def load_model(self) -> None:
         logger.info("Loading Fish Speech model...")
         start = time.time()
         loop = asyncio.get_running_loop()
-        await loop.run_in_executor(None, self._load_model_sync)
+        await loop.run_in_executor(LOAD_EXECUTOR, self._load_model_sync)
         self._loaded = True
         logger.info(f"Fish Speech model loaded in {time.time() - start:.1f}s (mode={'api' if self._model != 'cli_mode' else 'cli'})")
 
     def _load_model_sync(self):
+        from config import settings
+        cached = weight_cache.restore(self.get_name(), settings.device)
+        if cached is not None:
+            self._model = cached
+            return
         try:
             from fish_speech.inference import TTSInference
-            from config import settings
-            self._model = TTSInference(device=settings.device)
+            if settings.device.startswith("cuda"):
+                # Build on the CPU, then stream the weights over in one pipelined pass
+                model = TTSInference(device="cpu")
+                to_device(model, settings.device)
+                if hasattr(model, "device"):
+                    model.device = settings.device
+                self._model = model
+            else:
+                self._model = TTSInference(device=settings.device)
             logger.debug(f"Fish Speech API mode, device={settings.device}")
         except ImportError:
             self._model = "cli_mode"
+            with self._worker_lock:
+                self._worker = self._spawn_worker()
             logger.debug("Fish Speech CLI fallback mode")
 
+    @staticmethod
+    def _spawn_worker() -> subprocess.Popen:
+        return subprocess.Popen(
+            [sys.executable, "-m", "engines.fish_cli_worker"],
+            cwd=_BACKEND_DIR,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+        )
+
+    def _run_cli(self, args: list[str]) -> None:
+        """Run one fish_speech.infer invocation in the worker, respawning it once if it died."""
+        request = json.dumps({"args": args}) + "\n"
+        with self._worker_lock:
+            reply = ""
+            for _attempt in range(2):
+                if self._worker is None or self._worker.poll() is not None:
+                    self._worker = self._spawn_worker()
+                try:
+                    self._worker.stdin.write(request)
+                    self._worker.stdin.flush()
+                    reply = self._worker.stdout.readline()
+                except OSError:
+                    reply = ""
+                if reply:
+                    break
+                logger.warning("Fish Speech CLI worker exited, restarting")
+                self._worker = None
+        if not reply:
+            raise RuntimeError("Fish Speech CLI worker exited")
+        result = json.loads(reply)
+        if not result["ok"]:
+            raise RuntimeError(result["error"])
+
+    def _stop_worker(self) -> None:
+        with self._worker_lock:
+            worker, self._worker = self._worker, None
+        if worker is None or worker.poll() is not None:
+            return
+        try:
+            worker.stdin.write(json.dumps({"cmd": "shutdown"}) + "\n")
+            worker.stdin.flush()
+            worker.wait(timeout=10)
+        except (OSError, subprocess.TimeoutExpired):
+            worker.kill()
+
     async def unload_model(self) -> None:
-        self._model = None
+        allocated = cuda_allocated()
+        model, self._model = self._model, None
         self._loaded = False
-        import torch
-        if torch.cuda.is_available():
-            torch.cuda.empty_cache()
+        loop = asyncio.get_running_loop()
+        if model == "cli_mode":
+            await loop.run_in_executor(LOAD_EXECUTOR, self._stop_worker)
+        elif model is not None:
+            # Park the weights in host RAM so the next load skips the disk
+            await loop.run_in_executor(LOAD_EXECUTOR, weight_cache.offload, self.get_name(), model)
+        del model
+        await loop.run_in_executor(LOAD_EXECUTOR, release_cuda_cache, allocated)
         logger.info("Fish Speech model unloaded")
 
     async def generate(
@@ -131,12 +205,17 @@ class FishSpeechEngine(TTSEngine):
         if not self._loaded:
             raise RuntimeError("Fish Speech model not loaded")
 
+        if progress_callback:
+            progress_callback = _DebouncedProgress(progress_callback)
+
         if progress_callback:
             progress_callback(0.1, "Preparing text...")
 
         text = request.text
         if request.emotion:
-            marker = EMOTION_PRESETS.get(request.emotion, f"({request.emotion})")
+            marker = EMOTION_PRESETS.get(request.emotion)
+            if marker is None:
+                marker = f"({request.emotion})"
             text = f"{marker}{text}"
             logger.debug(f"Injected emotion marker: {marker}")
 
@@ -147,32 +226,42 @@ class FishSpeechEngine(TTSEngine):
             progress_callback(0.3, "Generating speech...")
 
         loop = asyncio.get_running_loop()
-        output_path = await loop.run_in_executor(
-            None,
+        output_path, n_samples = await loop.run_in_executor(
+            INFERENCE_EXECUTOR,
             lambda: self._generate_sync(text, request),
         )
 
         if progress_callback:
             progress_callback(1.0, "Complete")
 
-        info = sf.info(str(output_path))
+        if n_samples is None:
+            # CLI mode wrote the file out of process; its header is the only source
+            info = sf.info(str(output_path))
+            sample_rate, duration = int(info.samplerate), info.duration
+        else:
+            sample_rate, duration = self.SAMPLE_RATE, n_samples / self.SAMPLE_RATE
         elapsed = time.time() - start
-        logger.info(f"Generated {info.duration:.1f}s audio in {elapsed:.1f}s -> {output_path.name}")
+        logger.info(f"Generated {duration:.1f}s audio in {elapsed:.1f}s -> {output_path.name}")
 
         return GenerationResult(
             audio_path=output_path,
-            sample_rate=int(info.samplerate),
-            duration_seconds=info.duration,
+            sample_rate=sample_rate,
+            duration_seconds=duration,
             engine_used="fish-speech",
         )
 
-    def _generate_sync(self, text: str, request: GenerationRequest) -> Path:
-        file_id = str(uuid.uuid4())[:8]
-        timestamp = datetime.now().strftime("%Y%m%d")
-        output_dir = self._outputs_dir / timestamp
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = output_dir / f"{file_id}.wav"
+    def _generate_sync(self, text: str, request: GenerationRequest) -> tuple[Path, Optional[int]]:
+        """Run inference and write the WAV; returns (output_path, n_samples).
+
+        n_samples is None in CLI mode, where the audio never enters this process.
+        """
+        file_id = _new_file_id()
+        api_mode = self._model is not None and self._model != "cli_mode"
+        # MP3 is encoded straight from the samples in API mode; the CLI only writes WAV
+        as_mp3 = api_mode and request.output_format == "mp3"
+        output_path = _today_output_dir(self._outputs_dir) / f"{file_id}.{'mp3' if as_mp3 else 'wav'}"
 
+        n_samples = None
         ref_audio = None
         ref_text = None
         if request.voice and request.voice.reference_audio_path:
@@ -180,35 +269,32 @@ class FishSpeechEngine(TTSEngine):
             ref_text = request.voice.reference_text or ""
 
         try:
-            if self._model and self._model != "cli_mode":
+            if api_mode:
                 audio = self._model.generate(
                     text=text,
                     reference_audio=ref_audio,
                     reference_text=ref_text,
                     temperature=request.temperature,
                 )
-                sf.write(str(output_path), audio, self.SAMPLE_RATE)
+                if as_mp3:
+                    AudioProcessor.convert_array_to_mp3(audio, self.SAMPLE_RATE, output_path)
+                else:
+                    sf.write(str(output_path), audio, self.SAMPLE_RATE)
+                n_samples = len(audio)
             else:
-                import subprocess
-                import sys
-
-                cmd = [
-                    sys.executable, "-m", "fish_speech.infer",
-                    "--text", text,
-                    "--output", str(output_path),
-                ]
+                args = ["--text", text, "--output", str(output_path)]
                 if ref_audio:
-                    cmd.extend(["--reference-audio", str(ref_audio)])
+                    args.extend(["--reference-audio", str(ref_audio)])
                 if ref_text:
-                    cmd.extend(["--reference-text", ref_text])
+                    args.extend(["--reference-text", ref_text])
 
-                logger.debug(f"Running Fish Speech CLI: {' '.join(cmd[:6])}...")
-                subprocess.run(cmd, check=True, capture_output=True)
+                logger.debug(f"Running Fish Speech CLI worker: {' '.join(args[:4])}...")
+                self._run_cli(args)
         except Exception as e:
             logger.error(f"Fish Speech generation failed: {e}")
             raise RuntimeError(f"Fish Speech generation failed: {e}")
 
-        return output_path
+        return output_path, n_samples
 
     async def clone_voice(
         self,
@@ -233,7 +319,8 @@ class FishSpeechEngine(TTSEngine):
             created_at=datetime.now().isoformat(),
         )
 
-        profile.save(voice_dir / "metadata.json")
+        # Through the library, so the voice lands in its index and list_voices sees it
+        VoiceLibrary(self._voices_dir).save_voice(profile)
         logger.info(f"Cloned voice: {voice_name} (id={voice_id})")
         return profile
 
@@ -1,14 +1,13 @@
 import asyncio
 import time
-import uuid
-from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
 import numpy as np
 import soundfile as sf
 
-from .base import TTSEngine, GenerationRequest, GenerationResult, VoiceProfile, ProgressCallback
+from .base import TTSEngine, GenerationRequest, GenerationResult, VoiceProfile, ProgressCallback, _DebouncedProgress, _new_file_id, _today_output_dir
+from .engine_manager import INFERENCE_EXECUTOR, LOAD_EXECUTOR
 from utils.logging_config import get_logger
 
 logger = get_logger("engines.kokoro")
@@ -58,7 +57,7 @@ class KokoroEngine(TTSEngine):
         start = time.time()
         loop = asyncio.get_running_loop()
         self._pipeline = await loop.run_in_executor(
-            None, lambda: KPipeline(lang_code="a")
+            LOAD_EXECUTOR, lambda: KPipeline(lang_code="a")
         )
         logger.info(f"Kokoro model loaded in {time.time() - start:.1f}s")
 
@@ -74,6 +73,9 @@ class KokoroEngine(TTSEngine):
         if not self._pipeline:
             raise RuntimeError("Kokoro model not loaded. Call load_model() first.")
 
+        if progress_callback:
+            progress_callback = _DebouncedProgress(progress_callback)
+
         voice_name = "af_heart"
         if request.voice and request.voice.settings.get("kokoro_voice"):
             voice_name = request.voice.settings["kokoro_voice"]
@@ -84,29 +86,20 @@ class KokoroEngine(TTSEngine):
         if progress_callback:
             progress_callback(0.1, "Starting generation...")
 
+        file_id = _new_file_id()
+        output_path = _today_output_dir(self._outputs_dir) / f"{file_id}.wav"
+
         loop = asyncio.get_running_loop()
-        segments = await loop.run_in_executor(
-            None,
-            lambda: self._generate_sync(request.text, voice_name, request.speed),
+        total_samples = await loop.run_in_executor(
+            INFERENCE_EXECUTOR,
+            lambda: self._generate_sync(request.text, voice_name, request.speed, output_path),
         )
 
-        if not segments:
+        if not total_samples:
+            output_path.unlink(missing_ok=True)
             raise RuntimeError("No audio generated")
 
-        if progress_callback:
-            progress_callback(0.8, "Saving audio...")
-
-        full_audio = np.concatenate(segments)
-
-        file_id = str(uuid.uuid4())[:8]
-        timestamp = datetime.now().strftime("%Y%m%d")
-        output_dir = self._outputs_dir / timestamp
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = output_dir / f"{file_id}.wav"
-
-        sf.write(str(output_path), full_audio, self.SAMPLE_RATE)
-
-        duration = len(full_audio) / self.SAMPLE_RATE
+        duration = total_samples / self.SAMPLE_RATE
         elapsed = time.time() - start
         logger.info(f"Generated {duration:.1f}s audio in {elapsed:.1f}s -> {output_path.name}")
 
@@ -120,9 +113,21 @@ class KokoroEngine(TTSEngine):
             engine_used="kokoro",
         )
 
-    def _generate_sync(self, text: str, voice: str, speed: float) -> list:
-        segments = []
+    def _generate_sync(self, text: str, voice: str, speed: float, output_path: Path) -> int:
+        """Write each segment to output_path as it is generated; returns the sample count.
+
+        Streaming keeps peak memory at one segment instead of the whole
+        utterance plus its concatenated copy.
+        """
+        total_samples = 0
         generator = self._pipeline(text, voice=voice, speed=speed)
-        for _gs, _ps, audio in generator:
-            segments.append(audio)
-        return segments
+        with sf.SoundFile(
+            str(output_path), "w", samplerate=self.SAMPLE_RATE, channels=1, subtype="PCM_16",
+        ) as f:
+            for _gs, _ps, audio in generator:
+                if audio is None:
+                    continue
+                audio = np.asarray(audio)
+                f.write(audio)
+                total_samples += len(audio)
+        return total_samples
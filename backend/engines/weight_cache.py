@@ -0,0 +1,215 @@
+"""Host-RAM tier for unloaded model weights.
+
+Unloading an engine moves its torch modules to pinned CPU memory instead of
+dropping them, so the next activation is one host-to-device copy rather than
+a disk read + deserialize. Cached models are evicted least-recently-used
+first when the cache outgrows its budget or the host runs low on memory.
+
+to_device() is the shared host-to-device path, used both for restoring from
+this cache and for first loads built on the CPU. prefetch_hf_files() warms
+the Hugging Face cache in parallel ahead of a first load.
+"""
+
+import gc
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+import torch
+
+from config import settings
+from utils.logging_config import get_logger
+
+logger = get_logger("engines.weight_cache")
+
+# Evict when less than this much host memory would remain available
+MIN_AVAILABLE_BYTES = 2 * 1024 ** 3
+
+# Share of physical RAM the cache may pin when settings.ram_cache_gb is unset
+RAM_CACHE_DEFAULT_FRACTION = 0.25
+
+# Tensors pinned ahead of the copy stream in to_device()
+PIPELINE_DEPTH = 8
+
+# Concurrent downloads in prefetch_hf_files()
+PREFETCH_WORKERS = 4
+
+# empty_cache() is a device-wide sync; only worth it once this much was freed
+EMPTY_CACHE_MIN_FREED = 100 * 1024 * 1024
+
+
+def torch_modules(model: Any) -> list:
+    """The nn.Modules that hold a model's weights.
+
+    Vendor wrappers (F5TTS, TTSInference) are plain objects holding one or
+    more modules as attributes, so look one level down when needed.
+    """
+    if isinstance(model, torch.nn.Module):
+        return [model]
+    return [v for v in vars(model).values() if isinstance(v, torch.nn.Module)]
+
+
+def _tensors(modules: list):
+    for module in modules:
+        yield from module.parameters()
+        yield from module.buffers()
+
+
+def to_device(model: Any, device: str) -> None:
+    """Move a model's weights onto device, overlapping pinning with the copies.
+
+    A producer thread pins CPU tensors into a bounded queue while this thread
+    issues non-blocking H2D copies on a dedicated CUDA stream, so PCIe
+    transfers run back to back instead of waiting on Python between tensors.
+    """
+    tensors = [t for t in _tensors(torch_modules(model)) if t.device.type == "cpu"]
+    if not (device.startswith("cuda") and torch.cuda.is_available()):
+        for t in tensors:
+            t.data = t.data.to(device)
+        return
+
+    staged: queue.Queue = queue.Queue(maxsize=PIPELINE_DEPTH)
+    failure: list[BaseException] = []
+
+    def produce() -> None:
+        try:
+            for t in tensors:
+                cpu = t.data
+                staged.put((t, cpu if cpu.is_pinned() else cpu.pin_memory()))
+        except BaseException as e:
+            failure.append(e)
+        finally:
+            staged.put(None)
+
+    threading.Thread(target=produce, name="pin-weights", daemon=True).start()
+    stream = torch.cuda.Stream()
+    with torch.cuda.stream(stream):
+        while (item := staged.get()) is not None:
+            t, pinned = item
+            t.data = pinned.to(device, non_blocking=True)
+    stream.synchronize()
+    if failure:
+        raise failure[0]
+
+
+def cuda_allocated() -> Optional[int]:
+    """Bytes currently allocated by torch on the CUDA device, or None without CUDA."""
+    return torch.cuda.memory_allocated() if torch.cuda.is_available() else None
+
+
+def release_cuda_cache(allocated_before: Optional[int]) -> None:
+    """Return cached CUDA blocks to the driver if an unload actually freed memory."""
+    if allocated_before is None:
+        return
+    gc.collect()
+    freed = allocated_before - torch.cuda.memory_allocated()
+    if freed > EMPTY_CACHE_MIN_FREED:
+        torch.cuda.empty_cache()
+        logger.debug(f"Released {freed / 1024 ** 2:.0f}MB of CUDA cache")
+
+
+def prefetch_hf_files(files: list[tuple[str, str]]) -> None:
+    """Download (repo_id, filename) pairs into the Hugging Face cache in parallel.
+
+    Vendor loaders fetch their checkpoints one after another; warming the
+    cache first lets them all download at once, and the loader then finds
+    each file locally. Files already cached cost one metadata check each.
+    Failures are only logged -- the vendor loader will retry and report.
+    """
+    from huggingface_hub import hf_hub_download
+
+    def fetch(item: tuple[str, str]) -> None:
+        repo_id, filename = item
+        try:
+            hf_hub_download(repo_id, filename)
+        except Exception as e:
+            logger.warning(f"Prefetch of {repo_id}/{filename} failed: {e}")
+
+    with ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="hf-prefetch") as pool:
+        list(pool.map(fetch, files))
+
+
+def _host_available_bytes() -> Optional[int]:
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.virtual_memory().available
+
+
+def _budget_bytes() -> int:
+    """RAM tier budget from settings.ram_cache_gb, or a share of physical RAM.
+
+    Without psutil the host's memory can't be read, so an unset budget
+    leaves the tier off rather than pinning a guess.
+    """
+    if settings.ram_cache_gb is not None:
+        return int(settings.ram_cache_gb * 1024 ** 3)
+    try:
+        import psutil
+    except ImportError:
+        logger.warning("psutil not installed; RAM weight cache disabled (set ram_cache_gb to enable)")
+        return 0
+    return int(psutil.virtual_memory().total * RAM_CACHE_DEFAULT_FRACTION)
+
+
+class WeightCache:
+    """LRU of offloaded models keyed by engine name."""
+
+    def __init__(self, budget_bytes: int):
+        self._budget = budget_bytes
+        self._entries: OrderedDict[str, tuple[Any, int]] = OrderedDict()
+
+    def _used(self) -> int:
+        return sum(size for _, size in self._entries.values())
+
+    def offload(self, name: str, model: Any) -> bool:
+        """Move model's weights to pinned host memory and keep it. Returns False if it can't be cached."""
+        modules = torch_modules(model)
+        if not modules:
+            return False
+        size = sum(t.numel() * t.element_size() for t in _tensors(modules))
+        if size > self._budget:
+            logger.debug(f"{name}: {size / 1024 ** 3:.1f}GB exceeds the RAM cache budget, not caching")
+            return False
+
+        self._make_room(size)
+        pin = torch.cuda.is_available()
+        try:
+            for t in _tensors(modules):
+                cpu = t.data.to("cpu")
+                t.data = cpu.pin_memory() if pin else cpu
+        except RuntimeError as e:
+            # Typically pinned-memory exhaustion; the model is dropped instead
+            logger.warning(f"Failed to cache {name} weights in RAM: {e}")
+            return False
+        self._entries[name] = (model, size)
+        logger.info(f"Cached {name} weights in RAM ({size / 1024 ** 3:.1f}GB)")
+        return True
+
+    def restore(self, name: str, device: str) -> Optional[Any]:
+        """Pop name's cached model and move it back onto device; None on a miss."""
+        entry = self._entries.pop(name, None)
+        if entry is None:
+            return None
+        model, _ = entry
+        to_device(model, device)
+        logger.info(f"Restored {name} weights from RAM cache")
+        return model
+
+    def discard(self, name: str) -> None:
+        self._entries.pop(name, None)
+
+    def _make_room(self, incoming: int) -> None:
+        while self._entries:
+            available = _host_available_bytes()
+            low_memory = available is not None and available - incoming < MIN_AVAILABLE_BYTES
+            if self._used() + incoming <= self._budget and not low_memory:
+                return
+            evicted, _ = self._entries.popitem(last=False)
+            logger.info(f"Evicted {evicted} from RAM cache")
+
+
+weight_cache = WeightCache(_budget_bytes())
@@ -1,3 +1,5 @@
+import asyncio
+import os
 import threading
 import time
 import uuid
@@ -5,15 +7,18 @@ import webbrowser
 from contextlib import asynccontextmanager
 from pathlib import Path
 
+import torch
 import uvicorn
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 
+from utils.io_pool import run_io
 from utils.logging_config import setup_logging, get_logger
 from config import settings
 from api.router import api_router
+from api.voices import voice_library
 from engines.engine_manager import engine_manager
 from engines.kokoro_engine import KokoroEngine
 from engines.fish_speech_engine import FishSpeechEngine
@@ -51,19 +56,30 @@ async def lifespan(app: FastAPI):
     logger.info("AI Voice Studio starting up...")
     settings.ensure_directories()
     register_engines()
+    preload_task = None
+    # Reconcile the voice index with what is actually on disk (voices added or
+    # removed while the server was down, or written outside VoiceLibrary)
+    count = await run_io(voice_library.rebuild_index)
+    logger.info(f"Voice library: {count} voices")
+    if settings.preload_engines and settings.device == "cuda":
+        # In the background so the server is reachable while weights load;
+        # a request for a preloading engine joins its load
+        preload_task = asyncio.create_task(engine_manager.preload())
     logger.info(f"Server: http://{settings.host}:{settings.port}")
     yield
     # Shutdown
     logger.info("Shutting down -- cleaning up...")
-    active = engine_manager.get_active_engine()
-    if active:
+    if preload_task is not None and not preload_task.done():
+        preload_task.cancel()
+    loaded = engine_manager.get_loaded_names()
+    if loaded:
         try:
-            await active.unload_model()
-            logger.info(f"Unloaded engine: {engine_manager.get_active_name()}")
+            # deactivate() also stops the idle-unload watchdog
+            await engine_manager.deactivate()
+            logger.info(f"Unloaded engines: {', '.join(loaded)}")
         except Exception as e:
             logger.warning(f"Error unloading engine: {e}")
     try:
-        import torch
         if torch.cuda.is_available():
             torch.cuda.empty_cache()
             logger.info("GPU memory cleared")
@@ -71,7 +87,7 @@ async def lifespan(app: FastAPI):
         pass
     # Close WebSocket connections
     from api.ws import ws_manager
-    for conn in ws_manager.active_connections[:]:
+    for conn in list(ws_manager.active_connections):
         try:
             await conn.close()
         except Exception:
@@ -145,5 +161,7 @@ def open_browser_when_ready():
 if __name__ == "__main__":
     setup_logging(log_dir=settings.logs_dir)
     logger.info("Starting AI Voice Studio...")
-    threading.Thread(target=open_browser_when_ready, daemon=True).start()
+    # AVS_NO_BROWSER=1 for headless runs
+    if os.environ.get("AVS_NO_BROWSER") != "1":
+        threading.Thread(target=open_browser_when_ready, daemon=True).start()
     uvicorn.run(app, host=settings.host, port=settings.port)
@@ -1,3 +1,7 @@
+import asyncio
+import math
+import os
+import shutil
 import subprocess
 from pathlib import Path
 
@@ -8,6 +12,43 @@ from utils.logging_config import get_logger
 
 logger = get_logger("services.audio")
 
+# Frames per read/write in convert_format's libsndfile path
+CONVERT_BLOCK_FRAMES = 65536
+
+# Share of a min_silence_ms window that must be above threshold for
+# trim_silence to treat it as sound rather than a stray click
+MIN_LOUD_FRACTION = 0.01
+
+
+def _partial_path(path: Path) -> Path:
+    """Temp name to write to before renaming over path.
+
+    Renaming means a finished file is never seen half-written, and a path
+    that is hardlinked into the op cache gets a new inode instead of having
+    the cached copy rewritten underneath it.
+    """
+    return path.with_name(f"{path.stem}.partial{path.suffix}")
+
+
+# libmp3lame settings shared by every MP3 encode: 192k CBR is transparent for
+# voice. compression_level is LAME's -q (0 slowest/best, 9 fastest); 7 skips
+# the costlier psychoacoustic search, which matters little at this bitrate
+_LAME_ARGS = [
+    "-vn", "-codec:a", "libmp3lame", "-b:a", "192k", "-compression_level", "7",
+]
+
+
+def _mp3_command(input_path: Path, output_path: Path) -> list[str]:
+    """ffmpeg argv encoding input_path to MP3 at output_path."""
+    return [
+        "ffmpeg", "-y", "-loglevel", "warning",
+        "-i", str(input_path),
+        # Conversions run in parallel, one ffmpeg per core
+        "-threads", "1",
+        *_LAME_ARGS,
+        str(output_path),
+    ]
+
 
 class AudioProcessor:
     """Audio post-processing: format conversion, normalization, silence trimming."""
@@ -15,55 +56,148 @@ class AudioProcessor:
     @staticmethod
     def convert_format(input_path: Path, output_format: str) -> Path:
         output_path = input_path.with_suffix(f".{output_format}")
+        tmp_path = _partial_path(output_path)
         input_size = input_path.stat().st_size
-        logger.info(f"Converting {input_path.name} ({input_size} bytes) -> {output_format}")
+        logger.info("Converting %s (%d bytes) -> %s", input_path.name, input_size, output_format)
 
-        if output_format in ("wav", "flac", "ogg"):
-            data, sr = sf.read(str(input_path))
-            sf.write(str(output_path), data, sr, format=output_format.upper())
+        if input_path.suffix.lstrip(".").lower() == output_format:
+            # Already in the target format: no decode/encode, at most a link
+            if output_path == input_path:
+                return output_path
+            try:
+                os.link(input_path, tmp_path)
+            except OSError:
+                shutil.copyfile(input_path, tmp_path)
+        elif output_format in ("wav", "flac", "ogg"):
+            # Stream in blocks instead of decoding the whole file into RAM
+            with sf.SoundFile(str(input_path)) as src, sf.SoundFile(
+                str(tmp_path), "w", src.samplerate, src.channels, format=output_format.upper(),
+            ) as dst:
+                for block in src.blocks(blocksize=CONVERT_BLOCK_FRAMES, dtype="float32"):
+                    dst.write(block)
         elif output_format == "mp3":
             try:
                 result = subprocess.run(
-                    [
-                        "ffmpeg", "-y", "-i", str(input_path),
-                        "-codec:a", "libmp3lame", "-qscale:a", "2",
-                        str(output_path),
-                    ],
+                    _mp3_command(input_path, tmp_path),
                     check=True,
                     capture_output=True,
                 )
-                logger.debug(f"ffmpeg completed: {result.returncode}")
+                logger.debug("ffmpeg completed: %s", result.returncode)
             except FileNotFoundError:
                 raise RuntimeError(
                     "ffmpeg not found. Install ffmpeg and add it to your PATH for MP3 export."
                 )
             except subprocess.CalledProcessError as e:
-                logger.error(f"ffmpeg failed: {e.stderr.decode()}")
+                tmp_path.unlink(missing_ok=True)
+                logger.error("ffmpeg failed: %s", e.stderr.decode())
                 raise RuntimeError(f"MP3 conversion failed: {e.stderr.decode()}")
         else:
             raise ValueError(f"Unsupported format: {output_format}")
 
+        os.replace(tmp_path, output_path)
         output_size = output_path.stat().st_size
-        logger.info(f"Conversion complete: {output_path.name} ({output_size} bytes)")
+        logger.info("Conversion complete: %s (%d bytes)", output_path.name, output_size)
+        return output_path
+
+    @staticmethod
+    async def convert_format_batch_async(input_paths: list[Path], output_format: str) -> list[Path]:
+        """Convert several files concurrently, at most one encoder per core.
+
+        MP3 encodes run as ffmpeg subprocesses driven straight from the event
+        loop; libsndfile formats run convert_format in worker threads. Results
+        come back in input order; the first failure is raised.
+        """
+        limit = asyncio.Semaphore(os.cpu_count() or 1)
+
+        async def encode_mp3(input_path: Path) -> Path:
+            output_path = input_path.with_suffix(".mp3")
+            tmp_path = _partial_path(output_path)
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    *_mp3_command(input_path, tmp_path),
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+            except FileNotFoundError:
+                raise RuntimeError(
+                    "ffmpeg not found. Install ffmpeg and add it to your PATH for MP3 export."
+                )
+            _, stderr = await proc.communicate()
+            if proc.returncode != 0:
+                tmp_path.unlink(missing_ok=True)
+                logger.error("ffmpeg failed: %s", stderr.decode())
+                raise RuntimeError(f"MP3 conversion failed: {stderr.decode()}")
+            os.replace(tmp_path, output_path)
+            return output_path
+
+        async def convert_one(input_path: Path) -> Path:
+            async with limit:
+                if output_format == "mp3":
+                    return await encode_mp3(input_path)
+                return await asyncio.to_thread(AudioProcessor.convert_format, input_path, output_format)
+
+        logger.info("Batch converting %d files -> %s", len(input_paths), output_format)
+        return list(await asyncio.gather(*(convert_one(p) for p in input_paths)))
+
+    @staticmethod
+    def convert_array_to_mp3(samples: np.ndarray, sr: int, output_path: Path) -> Path:
+        """Encode an in-memory waveform to MP3 by piping raw float32 PCM into ffmpeg.
+
+        For callers that already hold the samples: skips writing an
+        intermediate WAV and ffmpeg's decode of it.
+        """
+        samples = np.ascontiguousarray(samples, dtype=np.float32)
+        channels = 1 if samples.ndim == 1 else samples.shape[1]
+        tmp_path = _partial_path(output_path)
+        try:
+            subprocess.run(
+                [
+                    "ffmpeg", "-y", "-loglevel", "warning",
+                    "-f", "f32le", "-ar", str(sr), "-ac", str(channels), "-i", "pipe:0",
+                    *_LAME_ARGS,
+                    "-f", "mp3", str(tmp_path),
+                ],
+                input=samples.tobytes(),
+                check=True,
+                capture_output=True,
+            )
+        except FileNotFoundError:
+            raise RuntimeError(
+                "ffmpeg not found. Install ffmpeg and add it to your PATH for MP3 export."
+            )
+        except subprocess.CalledProcessError as e:
+            tmp_path.unlink(missing_ok=True)
+            logger.error("ffmpeg failed: %s", e.stderr.decode())
+            raise RuntimeError(f"MP3 conversion failed: {e.stderr.decode()}")
+        os.replace(tmp_path, output_path)
+        logger.debug("Encoded %.1fs of audio -> %s", len(samples) / sr, output_path.name)
         return output_path
 
     @staticmethod
     def normalize_audio(input_path: Path, target_db: float = -20.0) -> Path:
-        data, sr = sf.read(str(input_path))
+        data, sr = sf.read(str(input_path), dtype="float32")
 
-        rms = np.sqrt(np.mean(data ** 2))
+        # Sum of squares via a BLAS dot (no data**2 temporary), then gain and
+        # clip in place -- half the bytes of float64 and no extra copies
+        flat = data.reshape(-1)
+        rms = math.sqrt(float(np.dot(flat, flat)) / flat.size) if flat.size else 0.0
         if rms > 0:
-            current_db = 20 * np.log10(rms)
+            current_db = 20 * math.log10(rms)
             gain_db = target_db - current_db
             gain = 10 ** (gain_db / 20)
-            data = data * gain
-            data = np.clip(data, -1.0, 1.0)
-            logger.info(f"Normalized {input_path.name}: {current_db:.1f}dB -> {target_db:.1f}dB (gain={gain_db:.1f}dB)")
+            np.multiply(data, np.float32(gain), out=data)
+            np.clip(data, -1.0, 1.0, out=data)
+            logger.info(
+                "Normalized %s: %.1fdB -> %.1fdB (gain=%.1fdB)",
+                input_path.name, current_db, target_db, gain_db,
+            )
         else:
-            logger.warning(f"Audio is silent, skipping normalization: {input_path.name}")
+            logger.warning("Audio is silent, skipping normalization: %s", input_path.name)
 
         output_path = input_path.with_stem(input_path.stem + "_normalized")
-        sf.write(str(output_path), data, sr)
+        tmp_path = _partial_path(output_path)
+        sf.write(str(tmp_path), data, sr)
+        os.replace(tmp_path, output_path)
         return output_path
 
     @staticmethod
@@ -72,29 +206,46 @@ class AudioProcessor:
         threshold_db: float = -40.0,
         min_silence_ms: int = 100,
     ) -> Path:
-        data, sr = sf.read(str(input_path))
+        data, sr = sf.read(str(input_path), dtype="float32")
         original_duration = len(data) / sr
 
-        if data.ndim > 1:
-            mono = np.mean(data, axis=1)
-        else:
-            mono = data
+        # Per-frame peak across channels: one pass, and a loud channel
+        # isn't cancelled out the way an average can be
+        level = np.abs(data)
+        if level.ndim > 1:
+            level = level.max(axis=1)
 
         threshold = 10 ** (threshold_db / 20)
         min_samples = int(sr * min_silence_ms / 1000)
 
-        above_threshold = np.abs(mono) > threshold
-
-        if not np.any(above_threshold):
-            logger.warning(f"Audio is all silence: {input_path.name}")
+        mask = level > threshold
+        if not mask.any():
+            logger.warning("Audio is all silence: %s", input_path.name)
             return input_path
 
-        start = max(0, np.argmax(above_threshold) - min_samples)
-        end = min(len(mono), len(mono) - np.argmax(above_threshold[::-1]) + min_samples)
+        if 0 < min_samples < len(mask):
+            # Loud-sample count of every min_silence_ms window, from one cumsum.
+            # A window is sound only if enough of it is loud, so an isolated
+            # click in the lead-in or tail doesn't hold the silence in place.
+            cs = np.concatenate(([0], np.cumsum(mask.view(np.int8))))
+            window = cs[min_samples:] - cs[:-min_samples]
+            sound = np.flatnonzero(window >= max(1, int(min_samples * MIN_LOUD_FRACTION)))
+            if sound.size == 0:
+                logger.warning("Audio has no sustained sound: %s", input_path.name)
+                return input_path
+            # Windows span min_samples, so the cut keeps that much lead-in/tail
+            start = int(sound[0])
+            end = int(sound[-1]) + min_samples
+        else:
+            loud = np.flatnonzero(mask)
+            start = max(0, int(loud[0]) - min_samples)
+            end = min(len(level), int(loud[-1]) + 1 + min_samples)
 
         trimmed = data[start:end]
         trimmed_duration = len(trimmed) / sr
         output_path = input_path.with_stem(input_path.stem + "_trimmed")
-        sf.write(str(output_path), trimmed, sr)
-        logger.info(f"Trimmed {input_path.name}: {original_duration:.1f}s -> {trimmed_duration:.1f}s")
+        tmp_path = _partial_path(output_path)
+        sf.write(str(tmp_path), trimmed, sr)
+        os.replace(tmp_path, output_path)
+        logger.info("Trimmed %s: %.1fs -> %.1fs", input_path.name, original_duration, trimmed_duration)
         return output_path
@@ -0,0 +1,103 @@
+"""Disk cache for audio post-processing results (convert, normalize, trim).
+
+Entries are keyed on the source path, its mtime and the operation
+parameters, so a repeat request for the same source and settings becomes a
+stat + hardlink instead of another ffmpeg/libsndfile pass. The cache is
+bounded in size and evicts least recently used entries first.
+"""
+
+import hashlib
+import os
+import shutil
+from collections import OrderedDict
+from pathlib import Path
+
+from utils.logging_config import get_logger
+
+logger = get_logger("services.op_cache")
+
+
+def _link_or_copy(src: Path, dest: Path) -> None:
+    """Atomically place src at dest, hardlinking when on the same volume."""
+    tmp = dest.with_name(f"{dest.name}.tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copy2(src, tmp)
+    os.replace(tmp, dest)
+
+
+class OpCache:
+    """Size-bounded LRU store of processed audio files.
+
+    Keys name a version of a source, not its content: a blake2b hash of the
+    source path, its mtime, the operation and its parameters. Entry sizes
+    count in full even while hardlinked to an output that still exists.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        self._cache_dir = cache_dir
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        # Entry file name -> size, least recently used first
+        self._entries: OrderedDict[str, int] = self._scan()
+        self._size = sum(self._entries.values())
+        self._evict()
+
+    def _scan(self) -> OrderedDict[str, int]:
+        """Entries already on disk, oldest first (mtime stands in for last use)."""
+        found = []
+        with os.scandir(self._cache_dir) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    st = entry.stat()
+                    found.append((st.st_mtime_ns, entry.name, st.st_size))
+        found.sort()
+        return OrderedDict((name, size) for _, name, size in found)
+
+    def _evict(self) -> None:
+        # The newest entry always stays, even when it alone is over budget
+        while self._size > self._max_bytes and len(self._entries) > 1:
+            name, size = self._entries.popitem(last=False)
+            self._size -= size
+            (self._cache_dir / name).unlink(missing_ok=True)
+            logger.debug(f"Op cache evicted {name} ({size} bytes)")
+
+    def key(self, source: Path, op: str, **params) -> str:
+        """Cache key for running op with params on the current version of source."""
+        mtime_ns = source.stat().st_mtime_ns
+        raw = repr((str(source), mtime_ns, op, sorted(params.items())))
+        return hashlib.blake2b(raw.encode(), digest_size=8).hexdigest()
+
+    def _entry(self, key: str, suffix: str) -> Path:
+        return self._cache_dir / f"{key}{suffix}"
+
+    def fetch(self, key: str, dest: Path) -> bool:
+        """Materialise a cached result at dest. Returns False on a cache miss."""
+        entry = self._entry(key, dest.suffix)
+        if not entry.exists():
+            return False
+        try:
+            if os.path.samefile(entry, dest):
+                return True
+        except FileNotFoundError:
+            pass
+        _link_or_copy(entry, dest)
+        if entry.name in self._entries:
+            self._entries.move_to_end(entry.name)
+        logger.debug(f"Op cache hit: {key} -> {dest.name}")
+        return True
+
+    def store(self, key: str, result: Path) -> None:
+        """Record result as the output for key."""
+        entry = self._entry(key, result.suffix)
+        try:
+            _link_or_copy(result, entry)
+            size = entry.stat().st_size
+        except OSError as e:
+            logger.warning(f"Failed to cache {result.name}: {e}")
+            return
+        self._size += size - self._entries.pop(entry.name, 0)
+        self._entries[entry.name] = size
+        self._evict()
@@ -5,18 +5,37 @@ Operates independently of EngineManager -- loads/unloads its own model.
 """
 
 import asyncio
+import functools
+import math
 import threading
 import time
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
+from config import settings
 from utils.logging_config import get_logger
 
 logger = get_logger("services.parler")
 
 
+# Initial size of the pinned audio buffer: the 30s generation cap at 44.1kHz
+_D2H_BUF_SAMPLES = 30 * 44100
+
+# RMS level generate_preview(normalize=True) scales to, as AudioProcessor.normalize_audio
+PREVIEW_TARGET_DB = -20.0
+
+# Seconds within which an identical progress update is not re-sent
+PROGRESS_REPEAT_INTERVAL = 1.0
+
+# Previews per model.generate() call in generate_previews_batch()
+PREVIEW_BATCH_SIZE = 8
+
+# Spoken in a preview when no sample text is given
+DEFAULT_PREVIEW_TEXT = "Hello, this is a preview of my custom voice. I hope you like how it sounds."
+
+
 class GenerationCancelled(Exception):
     """Raised when generation is cancelled due to client disconnect."""
 
@@ -98,9 +117,144 @@ VOICE_MODELS = {
 }
 
 
+def _parler_dtype(device: str):
+    """Weight dtype for Parler-TTS on device, per settings.parler_precision.
+
+    Generation is bound by weight and KV-cache reads, so half precision
+    roughly halves VRAM use and doubles decode throughput on GPU.
+    """
+    import torch
+
+    precision = settings.parler_precision
+    if not device.startswith("cuda") or precision == "fp32":
+        return torch.float32
+    if precision == "fp16":
+        return torch.float16
+    if precision == "bf16" or torch.cuda.is_bf16_supported():
+        return torch.bfloat16
+    return torch.float16
+
+
+def _quantize_int8(model) -> None:
+    """Swap the decoder's linear weights for int8 (weight-only) in place.
+
+    Decoding re-reads every decoder weight per token, so halving their bytes
+    versus bf16 speeds up the bandwidth-bound steps; activations and the
+    one-shot text encoder keep their dtype. Needs torchao; without it the
+    model runs unquantized.
+    """
+    try:
+        from torchao.quantization import int8_weight_only, quantize_
+    except ImportError:
+        logger.warning("parler_quant=int8 needs torchao (pip install torchao); running unquantized")
+        return
+    quantize_(getattr(model, "decoder", model), int8_weight_only())
+    logger.info("Quantized Parler-TTS decoder weights to int8")
+
+
+def _weight_cache_key(model_id: str) -> str:
+    """Name a Parler model goes by in engines.weight_cache, apart from the TTS engines."""
+    return f"parler-tts/{model_id}"
+
+
+def _compile_parler(model, tokenizer, device: str) -> None:
+    """Compile the decoding forward pass and warm it up.
+
+    With a static KV cache the per-token forward has fixed shapes, so
+    "reduce-overhead" can capture it as CUDA graphs instead of dispatching
+    hundreds of small kernels from Python each step. The warm-up generations
+    pay the compile cost at load time rather than on the first preview; they
+    use the default preview's token budget, so its static cache and graphs
+    are the ones a default-text preview reuses.
+    """
+    import torch
+
+    model.generation_config.cache_implementation = "static"
+    model.forward = torch.compile(model.forward, mode="reduce-overhead")
+
+    inputs = tokenizer(DEFAULT_PREVIEW_TEXT, return_tensors="pt").to(device)
+    with torch.no_grad():
+        # CUDA graphs are recorded on the second call
+        for _ in range(2):
+            model.generate(
+                input_ids=inputs.input_ids,
+                prompt_input_ids=inputs.input_ids,
+                max_new_tokens=_max_new_tokens(DEFAULT_PREVIEW_TEXT),
+            )
+
+
+def _is_compiled(model) -> bool:
+    return "forward" in model.__dict__
+
+
+def _compiled_state_survives_offload() -> bool:
+    """Whether a compiled forward stays valid after its weights move.
+
+    With inline_inbuilt_nn_modules (the default from torch 2.5) parameters
+    are ordinary graph inputs and CUDA graph trees re-record when their
+    addresses change; older releases bake the addresses into the graphs.
+    """
+    import torch
+
+    return getattr(torch._dynamo.config, "inline_inbuilt_nn_modules", False)
+
+
+def _drop_static_cache(model) -> None:
+    """Free the static KV cache generate() leaves on the model.
+
+    The compiled forward stays, so a model restored from the RAM cache
+    skips the compile and warm-up; the new cache gets allocated on the
+    next generate().
+    """
+    model.__dict__.pop("_cache", None)
+    model._modules.pop("_cache", None)
+
+
+def _release_compiled_state(model) -> None:
+    """Undo _compile_parler: drop the compiled forward, static KV cache and CUDA graphs.
+
+    generate() keeps the static cache on the model and the graphs pin their
+    own memory pool, so both would hold VRAM after the weights move off the
+    GPU -- and the graphs would replay against stale weight addresses.
+    """
+    import torch
+
+    compiled = model.__dict__.pop("forward", None) is not None
+    _drop_static_cache(model)
+    model.generation_config.cache_implementation = None
+    if compiled:
+        torch._dynamo.reset()
+
+
+def _parler_attn_implementation(dtype) -> str:
+    """Fused attention for the Parler decoder.
+
+    flash-attn's kernels when installed (half precision only), otherwise
+    torch's scaled_dot_product_attention with its flash and memory-efficient
+    backends enabled. Both tile attention instead of materializing the
+    full score matrix, cutting HBM traffic per decode step.
+    """
+    import torch
+
+    if torch.cuda.is_available():
+        torch.backends.cuda.enable_flash_sdp(True)
+        torch.backends.cuda.enable_mem_efficient_sdp(True)
+        if dtype in (torch.float16, torch.bfloat16):
+            try:
+                import flash_attn  # noqa: F401
+                return "flash_attention_2"
+            except ImportError:
+                pass
+    return "sdpa"
+
+
 class ParlerVoiceService:
     """Generates voice samples from text descriptions using Parler-TTS."""
 
+    # Tokenizers by hf_name. They hold no VRAM, so they survive unload() and
+    # a reload skips re-parsing the vocab and rebuilding the BPE tables.
+    _tokenizer_cache: dict[str, Any] = {}
+
     def __init__(self, previews_dir: Path, device: str = "cuda"):
         self._previews_dir = previews_dir
         self._device = device
@@ -108,6 +262,14 @@ class ParlerVoiceService:
         self._tokenizer = None
         self._loaded = False
         self._loaded_model_id: Optional[str] = None
+        # Pinned host buffer generated audio is copied into; kept across
+        # unloads and grown on demand
+        self._d2h_buf = None
+        self._d2h_lock = threading.Lock()
+        # api.ws's manager, resolved on first broadcast (api imports this module)
+        self._ws = None
+        self._last_progress: Optional[tuple] = None
+        self._last_progress_at = 0.0
 
     def is_available(self) -> bool:
         """Check if parler-tts package is installed."""
@@ -121,11 +283,26 @@ class ParlerVoiceService:
         """Return available model configurations."""
         return list(VOICE_MODELS.values())
 
+    async def _progress(self, stage: str, message: str, percent: int) -> None:
+        """Send a progress update via WebSocket.
+
+        A repeat of the previous update within PROGRESS_REPEAT_INTERVAL
+        is dropped.
+        """
+        now = time.monotonic()
+        key = (stage, message, percent)
+        if key == self._last_progress and now - self._last_progress_at < PROGRESS_REPEAT_INTERVAL:
+            return
+        self._last_progress, self._last_progress_at = key, now
+        await self._broadcast({"type": "progress", "stage": stage, "message": message, "percent": percent})
+
     async def _broadcast(self, msg: dict) -> None:
-        """Send progress update via WebSocket."""
+        """Send a message via WebSocket."""
         try:
-            from api.ws import ws_manager
-            await ws_manager.broadcast(msg)
+            if self._ws is None:
+                from api.ws import ws_manager
+                self._ws = ws_manager
+            await self._ws.broadcast(msg)
         except Exception:
             pass
 
@@ -147,12 +324,11 @@ class ParlerVoiceService:
         hf_name = model_config["hf_name"]
         logger.info(f"Loading Parler-TTS model: {hf_name}")
 
-        await self._broadcast({
-            "type": "progress",
-            "stage": "loading_model",
-            "message": f"Loading {model_config['name']} (downloading on first run ~{model_config['download_gb']}GB)...",
-            "percent": 10,
-        })
+        await self._progress(
+            "loading_model",
+            f"Loading {model_config['name']} (downloading on first run ~{model_config['download_gb']}GB)...",
+            10,
+        )
 
         import torch
         from parler_tts import ParlerTTSForConditionalGeneration
@@ -160,75 +336,159 @@ class ParlerVoiceService:
 
         # Unload any active TTS engine to free VRAM
         from engines.engine_manager import engine_manager
-        if engine_manager.get_active_engine():
-            logger.info(f"Unloading active engine '{engine_manager.get_active_name()}' to free VRAM")
+        if engine_manager.get_loaded_names() or engine_manager.get_loading_names():
+            logger.info(
+                f"Unloading engines {engine_manager.get_loaded_names() + engine_manager.get_loading_names()} to free VRAM"
+            )
             await engine_manager.deactivate()
             if torch.cuda.is_available():
                 torch.cuda.empty_cache()
 
-        await self._broadcast({
-            "type": "progress",
-            "stage": "loading_model",
-            "message": "Downloading model weights (this only happens once)...",
-            "percent": 30,
-        })
+        from engines.weight_cache import weight_cache
 
         loop = asyncio.get_event_loop()
+        cache_key = _weight_cache_key(model_id)
+        # A model unloaded earlier is still in host RAM: one H2D copy, no disk read
         self._model = await loop.run_in_executor(
-            None,
-            lambda: ParlerTTSForConditionalGeneration.from_pretrained(
-                hf_name,
-            ).to(self._device),
+            None, weight_cache.restore, cache_key, self._device,
         )
 
-        await self._broadcast({
-            "type": "progress",
-            "stage": "loading_model",
-            "message": "Loading tokenizer...",
-            "percent": 80,
-        })
-
-        self._tokenizer = await loop.run_in_executor(
-            None,
-            lambda: AutoTokenizer.from_pretrained(hf_name),
+        if self._model is None:
+            await self._progress(
+                "loading_model",
+                "Downloading model weights (this only happens once)...",
+                30,
+            )
+
+            dtype = _parler_dtype(self._device)
+            attn = _parler_attn_implementation(dtype)
+            logger.info(f"Parler-TTS weights dtype: {dtype}, attention: {attn}")
+
+            def _from_pretrained():
+                try:
+                    model = ParlerTTSForConditionalGeneration.from_pretrained(
+                        hf_name, torch_dtype=dtype, attn_implementation=attn,
+                    )
+                except (ValueError, ImportError) as e:
+                    # Older parler-tts releases only implement eager attention
+                    logger.warning(f"{attn} attention unavailable, using eager: {e}")
+                    model = ParlerTTSForConditionalGeneration.from_pretrained(
+                        hf_name, torch_dtype=dtype,
+                    )
+                model = model.to(self._device)
+                if settings.parler_quant == "int8" and self._device.startswith("cuda"):
+                    _quantize_int8(model)
+                return model
+
+            self._model = await loop.run_in_executor(None, _from_pretrained)
+
+        await self._progress(
+            "loading_model",
+            "Loading tokenizer...",
+            80,
         )
 
+        self._tokenizer = self._tokenizer_cache.get(hf_name)
+        if self._tokenizer is None:
+            self._tokenizer = await loop.run_in_executor(
+                None,
+                lambda: AutoTokenizer.from_pretrained(hf_name),
+            )
+            self._tokenizer_cache[hf_name] = self._tokenizer
+
+        # A model restored from the RAM cache may still carry its compiled forward
+        if (
+            settings.parler_compile
+            and self._device.startswith("cuda")
+            and not _is_compiled(self._model)
+        ):
+            await self._progress(
+                "loading_model",
+                "Compiling model for faster generation...",
+                90,
+            )
+            try:
+                await loop.run_in_executor(
+                    None,
+                    lambda: _compile_parler(self._model, self._tokenizer, self._device),
+                )
+            except Exception as e:
+                # Missing triton, unsupported GPU, etc. -- eager mode still works
+                logger.warning(f"torch.compile unavailable for Parler-TTS, running eager: {e}")
+                _release_compiled_state(self._model)
+
         self._loaded = True
         self._loaded_model_id = model_id
         logger.info(f"Parler-TTS model loaded: {model_config['name']}")
 
-        await self._broadcast({
-            "type": "progress",
-            "stage": "model_ready",
-            "message": "Model loaded successfully",
-            "percent": 100,
-        })
+        await self._progress(
+            "model_ready",
+            "Model loaded successfully",
+            100,
+        )
+
+    def _to_host(self, generation, normalize: bool = False):
+        """Copy generated audio off the GPU as a flat float32 numpy array.
+
+        The copy lands in a reused pinned buffer, so it runs as a DMA straight
+        from the device instead of through a pageable staging allocation.
+        With normalize, the audio is RMS-normalized on the device first.
+        """
+        import torch
+
+        audio = generation.to(torch.float32).view(-1)
+        if normalize:
+            _normalize_rms_(audio, PREVIEW_TARGET_DB)
+        if audio.device.type != "cuda":
+            return audio.numpy()
+
+        n = audio.numel()
+        if self._d2h_buf is None or self._d2h_buf.numel() < n:
+            self._d2h_buf = torch.empty(max(n, _D2H_BUF_SAMPLES), dtype=torch.float32, pin_memory=True)
+        out = self._d2h_buf[:n]
+        out.copy_(audio, non_blocking=True)
+        torch.cuda.current_stream().synchronize()
+        # A view into the buffer: valid until the next preview overwrites it
+        return out.numpy()
 
     async def unload(self) -> None:
         """Unload model and free VRAM."""
         if not self._loaded:
             return
 
-        import torch
+        from engines.weight_cache import cuda_allocated, release_cuda_cache, weight_cache
 
-        del self._model
-        del self._tokenizer
-        self._model = None
+        allocated = cuda_allocated()
+        model, self._model = self._model, None
+        cache_key = _weight_cache_key(self._loaded_model_id)
         self._tokenizer = None
         self._loaded = False
         self._loaded_model_id = None
 
-        if torch.cuda.is_available():
-            torch.cuda.empty_cache()
+        # Keep the weights in host RAM so reloading this model skips the disk.
+        # The static KV cache is freed; the compiled forward is kept where
+        # torch can re-record its graphs for the restored weights. Quantized
+        # weights are tensor subclasses the cache can't move, so those models
+        # are rebuilt from the HF cache instead.
+        loop = asyncio.get_event_loop()
+        if _is_compiled(model) and not _compiled_state_survives_offload():
+            await loop.run_in_executor(None, _release_compiled_state, model)
+        else:
+            _drop_static_cache(model)
+        if settings.parler_quant == "none":
+            await loop.run_in_executor(None, weight_cache.offload, cache_key, model)
+        del model
+        await loop.run_in_executor(None, release_cuda_cache, allocated)
 
         logger.info("Parler-TTS model unloaded")
 
     async def generate_preview(
         self,
         description: str,
-        sample_text: str = "Hello, this is a preview of my custom voice. I hope you like how it sounds.",
+        sample_text: str = DEFAULT_PREVIEW_TEXT,
         model_id: str = "parler-mini-v1.1",
         temperature: float = 1.0,
+        normalize: bool = False,
         request=None,
     ) -> tuple[Path, float]:
         """Generate a short audio sample from a voice description.
@@ -238,6 +498,7 @@ class ParlerVoiceService:
             sample_text: Text for the voice to speak in the preview
             model_id: Which model to use for generation
             temperature: Sampling temperature (lower = more consistent, higher = more varied)
+            normalize: RMS-normalize to PREVIEW_TARGET_DB on the device before saving
             request: FastAPI Request object for disconnect detection
 
         Returns:
@@ -251,53 +512,38 @@ class ParlerVoiceService:
 
         await self.load(model_id)
 
-        await self._broadcast({
-            "type": "progress",
-            "stage": "generating",
-            "message": f"Generating voice preview with {model_config['name']}...",
-            "percent": 50,
-        })
+        await self._progress(
+            "generating",
+            f"Generating voice preview with {model_config['name']}...",
+            50,
+        )
 
         logger.info(
-            f"Generating preview [{model_id}]: "
-            f"description='{description[:80]}...', text='{sample_text[:50]}...', "
-            f"temperature={temperature}"
+            "Generating preview [%s]: description='%.80s...', text='%.50s...', temperature=%s",
+            model_id, description, sample_text, temperature,
         )
 
         loop = asyncio.get_event_loop()
+        output_path = self._new_preview_path()
 
         # Cancel flag checked by StoppingCriteria inside model.generate()
         cancel_event = threading.Event()
 
         def _generate():
-            from transformers import StoppingCriteria, StoppingCriteriaList
-
-            class CancelCheck(StoppingCriteria):
-                """Abort generation when the cancel event is set."""
-                def __call__(self, input_ids, scores, **kwargs):
-                    return cancel_event.is_set()
-
             input_ids = self._tokenizer(
                 description, return_tensors="pt"
             ).input_ids.to(self._device)
 
-            prompt_input_ids = self._tokenizer(
-                sample_text, return_tensors="pt"
-            ).input_ids.to(self._device)
-
-            # Cap generation length to prevent runaway buzzing.
-            # Parler-TTS uses ~760 tokens per second of audio
-            # (DAC codec ~86 frames/s * ~9 codebooks).
-            word_count = len(sample_text.split())
-            est_seconds = max(word_count * 0.5, 3.0)  # ~0.5s per word, min 3s
-            max_seconds = min(est_seconds * 2, 30.0)   # 2x buffer, cap 30s
-            max_tokens = int(max_seconds * 760)
+            # Sample text is usually the default and repeats across previews
+            prompt_input_ids = _prompt_input_ids(
+                model_config["hf_name"], sample_text
+            ).to(self._device, non_blocking=True)
 
             gen_kwargs = {
                 "input_ids": input_ids,
                 "prompt_input_ids": prompt_input_ids,
-                "max_new_tokens": max_tokens,
-                "stopping_criteria": StoppingCriteriaList([CancelCheck()]),
+                "max_new_tokens": _max_new_tokens(sample_text),
+                "stopping_criteria": _cancel_criteria(cancel_event),
             }
 
             # Temperature controls randomness in voice characteristics
@@ -311,16 +557,143 @@ class ParlerVoiceService:
             if cancel_event.is_set():
                 return None
 
-            return generation.cpu().float().numpy().squeeze()
+            # Written here, while the samples still sit in the pinned buffer.
+            # _to_host hands back float32; store it as-is, skipping a PCM_16 conversion pass
+            with self._d2h_lock:
+                audio = self._to_host(generation, normalize)
+                sf.write(str(output_path), audio, sample_rate, subtype="FLOAT")
+            return len(audio)
 
-        # Run generation with periodic heartbeat + disconnect detection
         gen_future = loop.run_in_executor(None, _generate)
+        num_samples = await self._await_generation(gen_future, cancel_event, request, model_config)
+
+        duration = num_samples / sample_rate
+        logger.info("Preview generated: %s (%.1fs)", output_path.name, duration)
+
+        await self._progress(
+            "complete",
+            f"Preview generated ({duration:.1f}s)",
+            100,
+        )
+
+        # Auto-unload to free VRAM for other uses
+        await self.unload()
+
+        return output_path, duration
+
+    async def generate_previews_batch(
+        self,
+        items: list[tuple[str, str]],
+        model_id: str = "parler-mini-v1.1",
+        temperature: float = 1.0,
+        normalize: bool = False,
+        request=None,
+    ) -> list[tuple[Path, float]]:
+        """Generate previews for several (description, sample_text) pairs.
+
+        Pairs are padded into batches of up to PREVIEW_BATCH_SIZE and each
+        batch is one model.generate() call, so the decoder's matmuls run
+        over the whole batch instead of once per preview.
+
+        Returns:
+            [(audio_path, duration_seconds)] in the order of items
+        """
+        import torch
+        import soundfile as sf
+
+        model_config = VOICE_MODELS.get(model_id, VOICE_MODELS["parler-mini-v1.1"])
+        sample_rate = model_config["sample_rate"]
+
+        await self.load(model_id)
+
+        await self._progress(
+            "generating",
+            f"Generating {len(items)} voice previews with {model_config['name']}...",
+            50,
+        )
+        logger.info("Generating %d previews [%s], temperature=%s", len(items), model_id, temperature)
+
+        loop = asyncio.get_event_loop()
+        cancel_event = threading.Event()
+        results: list[tuple[Path, float]] = []
+
+        for offset in range(0, len(items), PREVIEW_BATCH_SIZE):
+            batch = items[offset:offset + PREVIEW_BATCH_SIZE]
+            output_paths = [self._new_preview_path() for _ in batch]
+
+            def _generate(batch=batch, output_paths=output_paths):
+                descriptions = self._tokenizer(
+                    [description for description, _ in batch], return_tensors="pt", padding=True,
+                ).to(self._device)
+                prompts = self._tokenizer(
+                    [sample_text for _, sample_text in batch], return_tensors="pt", padding=True,
+                ).to(self._device)
+
+                gen_kwargs = {
+                    "input_ids": descriptions.input_ids,
+                    "attention_mask": descriptions.attention_mask,
+                    "prompt_input_ids": prompts.input_ids,
+                    "prompt_attention_mask": prompts.attention_mask,
+                    "max_new_tokens": max(_max_new_tokens(sample_text) for _, sample_text in batch),
+                    "stopping_criteria": _cancel_criteria(cancel_event),
+                    # Carries each preview's unpadded audio length
+                    "return_dict_in_generate": True,
+                }
+                if temperature != 1.0:
+                    gen_kwargs["temperature"] = temperature
+                    gen_kwargs["do_sample"] = True
+
+                with torch.no_grad():
+                    generation = self._model.generate(**gen_kwargs)
+
+                if cancel_event.is_set():
+                    return None
+
+                lengths = []
+                with self._d2h_lock:
+                    for i, output_path in enumerate(output_paths):
+                        audio = self._to_host(
+                            generation.sequences[i, :int(generation.audios_length[i])], normalize,
+                        )
+                        sf.write(str(output_path), audio, sample_rate, subtype="FLOAT")
+                        lengths.append(len(audio))
+                return lengths
+
+            gen_future = loop.run_in_executor(None, _generate)
+            lengths = await self._await_generation(gen_future, cancel_event, request, model_config)
+            results.extend(
+                (output_path, n / sample_rate) for output_path, n in zip(output_paths, lengths)
+            )
+
+        logger.info("Generated %d previews", len(results))
+        await self._progress(
+            "complete",
+            f"Generated {len(results)} previews",
+            100,
+        )
+
+        await self.unload()
+        return results
+
+    def _new_preview_path(self) -> Path:
+        """A fresh preview file path in today's previews subfolder."""
+        date_str = datetime.now().strftime("%Y%m%d")
+        output_dir = self._previews_dir / date_str
+        output_dir.mkdir(parents=True, exist_ok=True)
+        return output_dir / f"preview_{uuid.uuid4().hex[:12]}.wav"
+
+    async def _await_generation(self, gen_future, cancel_event, request, model_config):
+        """Wait for a generation future with periodic heartbeat + disconnect detection.
+
+        Raises GenerationCancelled (after unloading) if the client went away
+        or the generation returned None.
+        """
         start_time = time.monotonic()
         cancelled = False
 
         while True:
             try:
-                audio = await asyncio.wait_for(asyncio.shield(gen_future), timeout=5.0)
+                result = await asyncio.wait_for(asyncio.shield(gen_future), timeout=5.0)
                 break
             except asyncio.TimeoutError:
                 elapsed = int(time.monotonic() - start_time)
@@ -329,47 +702,70 @@ class ParlerVoiceService:
                 if request is not None:
                     try:
                         if await request.is_disconnected():
-                            logger.info(f"Client disconnected after {elapsed}s, cancelling generation")
+                            logger.info("Client disconnected after %ds, cancelling generation", elapsed)
                             cancel_event.set()
                             cancelled = True
                             # Wait for the thread to finish (should be quick after cancel)
-                            audio = await gen_future
+                            result = await gen_future
                             break
                     except Exception:
                         pass
 
-                await self._broadcast({
-                    "type": "progress",
-                    "stage": "generating",
-                    "message": f"Generating with {model_config['name']}... ({elapsed}s elapsed)",
-                    "percent": 50,
-                })
+                await self._progress(
+                    "generating",
+                    f"Generating with {model_config['name']}... ({elapsed}s elapsed)",
+                    50,
+                )
 
-        if cancelled or audio is None:
+        if cancelled or result is None:
             await self.unload()
             raise GenerationCancelled()
+        return result
 
-        duration = len(audio) / sample_rate
 
-        # Save to previews directory with date subfolder
-        date_str = datetime.now().strftime("%Y%m%d")
-        output_dir = self._previews_dir / date_str
-        output_dir.mkdir(parents=True, exist_ok=True)
+def _normalize_rms_(audio, target_db: float) -> None:
+    """Scale a float32 tensor in place to target_db RMS, clipped to [-1, 1].
 
-        filename = f"preview_{uuid.uuid4().hex[:12]}.wav"
-        output_path = output_dir / filename
+    Same math as AudioProcessor.normalize_audio, run as a few kernels on the
+    tensor's own device instead of a WAV decode/encode after the fact.
+    """
+    rms = audio.norm() / math.sqrt(max(audio.numel(), 1))
+    audio.mul_(10 ** (target_db / 20) / rms.clamp_min(1e-8)).clamp_(-1.0, 1.0)
 
-        sf.write(str(output_path), audio, sample_rate)
-        logger.info(f"Preview generated: {output_path.name} ({duration:.1f}s)")
 
-        await self._broadcast({
-            "type": "progress",
-            "stage": "complete",
-            "message": f"Preview generated ({duration:.1f}s)",
-            "percent": 100,
-        })
+def _max_new_tokens(sample_text: str) -> int:
+    """Cap generation length to prevent runaway buzzing.
 
-        # Auto-unload to free VRAM for other uses
-        await self.unload()
+    Parler-TTS uses ~760 tokens per second of audio
+    (DAC codec ~86 frames/s * ~9 codebooks).
+    """
+    word_count = len(sample_text.split())
+    est_seconds = max(word_count * 0.5, 3.0)  # ~0.5s per word, min 3s
+    max_seconds = min(est_seconds * 2, 30.0)   # 2x buffer, cap 30s
+    return int(max_seconds * 760)
 
-        return output_path, duration
+
+def _cancel_criteria(cancel_event: threading.Event):
+    """StoppingCriteriaList that aborts model.generate() once cancel_event is set."""
+    from transformers import StoppingCriteria, StoppingCriteriaList
+
+    class CancelCheck(StoppingCriteria):
+        """Abort generation when the cancel event is set."""
+        def __call__(self, input_ids, scores, **kwargs):
+            return cancel_event.is_set()
+
+    return StoppingCriteriaList([CancelCheck()])
+
+
+@functools.lru_cache(maxsize=32)
+def _prompt_input_ids(hf_name: str, text: str):
+    """Tokenized prompt text as a CPU tensor, pinned when CUDA is available.
+
+    Keyed by hf_name because tokenizers live in ParlerVoiceService's
+    class-level cache for the life of the process.
+    """
+    import torch
+
+    tokenizer = ParlerVoiceService._tokenizer_cache[hf_name]
+    input_ids = tokenizer(text, return_tensors="pt").input_ids
+    return input_ids.pin_memory() if torch.cuda.is_available() else input_ids
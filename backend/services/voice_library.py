@@ -1,12 +1,39 @@
+import functools
+import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
+import orjson
+
 from engines.base import VoiceProfile
 from utils.logging_config import get_logger
 
 logger = get_logger("services.voice_library")
 
+# Mirror of every voice's metadata.json, so listing is one read instead of N
+INDEX_FILE = "index.json"
+
+# Concurrent metadata.json reads in rebuild_index()
+SCAN_WORKERS = 8
+
+
+@functools.lru_cache(maxsize=256)
+def _read_metadata(meta_path: str, mtime_ns: int) -> dict:
+    """Parse a metadata.json once per modification; mtime_ns is the cache key.
+
+    Shared by every caller, so never handed out directly -- see _load_profile().
+    """
+    with open(meta_path, "rb") as f:
+        return orjson.loads(f.read())
+
+
+def _load_profile(meta_path: str, mtime_ns: int) -> VoiceProfile:
+    """A fresh VoiceProfile from the cached metadata; callers may mutate it freely."""
+    data = _read_metadata(meta_path, mtime_ns)
+    return VoiceProfile.from_dict({**data, "settings": dict(data.get("settings") or {})})
+
 
 class VoiceLibrary:
     """Manages saved voice profiles."""
@@ -14,38 +41,85 @@ class VoiceLibrary:
     def __init__(self, voices_dir: Path):
         self._voices_dir = voices_dir
         self._voices_dir.mkdir(parents=True, exist_ok=True)
+        self._index_path = voices_dir / INDEX_FILE
+
+    def mtime(self) -> int:
+        """Modification stamp of the library, changed by every save and delete."""
+        return self._voices_dir.stat().st_mtime_ns
+
+    def _read_index(self) -> Optional[dict[str, dict]]:
+        try:
+            return orjson.loads(self._index_path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except orjson.JSONDecodeError as e:
+            logger.warning(f"Voice index is corrupt, rebuilding: {e}")
+            return None
+
+    def _write_index(self, index: dict[str, dict]) -> None:
+        # Write + rename so readers never see a partial index. The rename also
+        # bumps the voices dir mtime, which is what mtime() reports.
+        tmp = self._index_path.with_name(f"{INDEX_FILE}.tmp")
+        tmp.write_bytes(orjson.dumps(index))
+        os.replace(tmp, self._index_path)
+
+    def rebuild_index(self) -> int:
+        """Re-scan every voice directory and rewrite the index. Returns the voice count."""
+        # scandir's entries carry their type, so only metadata files get opened;
+        # the reads themselves overlap, which matters on slow or network disks
+        with os.scandir(self._voices_dir) as it:
+            voice_ids = [e.name for e in it if e.is_dir(follow_symlinks=False)]
+
+        def load(voice_id: str) -> Optional[dict]:
+            try:
+                return VoiceProfile.load(self._voices_dir / voice_id / "metadata.json").to_dict()
+            except FileNotFoundError:
+                return None
+            except Exception as e:
+                logger.warning(f"Failed to load voice from {voice_id}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=SCAN_WORKERS, thread_name_prefix="voice-scan") as pool:
+            loaded = pool.map(load, voice_ids)
+            index = {
+                voice_id: data
+                for voice_id, data in sorted(zip(voice_ids, loaded))
+                if data is not None
+            }
+        self._write_index(index)
+        logger.debug(f"Rebuilt voice index: {len(index)} profiles")
+        return len(index)
 
     def list_voices(self) -> list[VoiceProfile]:
-        voices = []
-        if not self._voices_dir.exists():
-            return voices
-
-        for voice_dir in sorted(self._voices_dir.iterdir()):
-            if voice_dir.is_dir():
-                meta_path = voice_dir / "metadata.json"
-                if meta_path.exists():
-                    try:
-                        profile = VoiceProfile.load(meta_path)
-                        voices.append(profile)
-                    except Exception as e:
-                        logger.warning(f"Failed to load voice from {voice_dir.name}: {e}")
-                        continue
+        index = self._read_index()
+        if index is None:
+            self.rebuild_index()
+            index = self._read_index() or {}
+
+        voices = [VoiceProfile.from_dict(index[voice_id]) for voice_id in sorted(index)]
         logger.debug(f"Loaded {len(voices)} voice profiles")
         return voices
 
     def get_voice(self, voice_id: str) -> Optional[VoiceProfile]:
-        meta_path = self._voices_dir / voice_id / "metadata.json"
-        if meta_path.exists():
-            try:
-                return VoiceProfile.load(meta_path)
-            except Exception as e:
-                logger.error(f"Failed to load voice {voice_id}: {e}")
+        meta_path = os.path.join(self._voices_dir, voice_id, "metadata.json")
+        try:
+            return _load_profile(meta_path, os.stat(meta_path).st_mtime_ns)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Failed to load voice {voice_id}: {e}")
         return None
 
     def delete_voice(self, voice_id: str) -> bool:
         voice_dir = self._voices_dir / voice_id
         if voice_dir.exists():
             shutil.rmtree(str(voice_dir))
+            index = self._read_index()
+            if index is None:
+                self.rebuild_index()
+            else:
+                index.pop(voice_id, None)
+                self._write_index(index)
             logger.info(f"Deleted voice: {voice_id}")
             return True
         return False
@@ -54,4 +128,12 @@ class VoiceLibrary:
         voice_dir = self._voices_dir / profile.id
         voice_dir.mkdir(parents=True, exist_ok=True)
         profile.save(voice_dir / "metadata.json")
+        # Index last: the voice dir exists before its metadata lands, and the
+        # index rename is what moves mtime() once the profile is readable
+        index = self._read_index()
+        if index is None:
+            self.rebuild_index()
+        else:
+            index[profile.id] = profile.to_dict()
+            self._write_index(index)
         logger.info(f"Saved voice: {profile.name} (id={profile.id})")
@@ -0,0 +1,24 @@
+"""Dedicated thread pool for blocking file and driver calls made from async handlers.
+
+Kept separate from asyncio's default executor so slow disk or NVML calls
+cannot starve the threads the engines use for model work.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+IO_POOL = ThreadPoolExecutor(
+    max_workers=min(32, (os.cpu_count() or 1) * 4),
+    thread_name_prefix="io",
+)
+
+
+async def run_io(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking call on the IO pool without stalling the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(IO_POOL, partial(fn, *args, **kwargs))
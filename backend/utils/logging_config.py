@@ -1,18 +1,46 @@
+import atexit
 import logging
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 
+# Drains the log queue into the real handlers on its own thread
+_listener: QueueListener | None = None
+
+
+class _RawQueueHandler(QueueHandler):
+    """QueueHandler that enqueues records unformatted.
+
+    The stock prepare() runs format() -- getMessage() included -- on the
+    logging thread; here the listener's handlers do all of it instead. Records
+    never leave the process, so args and exc_info need no flattening.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
 
 def setup_logging(log_dir: Path | None = None, level: int = logging.DEBUG) -> None:
     """Configure logging for the entire application.
 
     - Console handler (INFO+) for user-facing output
     - File handler (DEBUG) for detailed debugging with rotation
+
+    Loggers only enqueue records; a QueueListener thread interpolates their
+    %-style args, formats and writes them, so neither formatting nor console
+    and file I/O runs on the event loop. f-string messages are still built
+    by the caller.
     """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
     root = logging.getLogger("voice_studio")
     root.setLevel(level)
     root.handlers.clear()
+    handlers: list[logging.Handler] = []
 
     fmt = logging.Formatter(
         "%(asctime)s [%(levelname)-7s] %(name)s: %(message)s",
@@ -23,7 +51,7 @@ def setup_logging(log_dir: Path | None = None, level: int = logging.DEBUG) -> No
     console = logging.StreamHandler(sys.stdout)
     console.setLevel(logging.INFO)
     console.setFormatter(fmt)
-    root.addHandler(console)
+    handlers.append(console)
 
     # File handler -- DEBUG level with rotation (10MB, keep 3 backups)
     if log_dir:
@@ -36,7 +64,23 @@ def setup_logging(log_dir: Path | None = None, level: int = logging.DEBUG) -> No
         )
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(fmt)
-        root.addHandler(file_handler)
+        handlers.append(file_handler)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root.addHandler(_RawQueueHandler(log_queue))
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
 
 
 def get_logger(name: str) -> logging.Logger:
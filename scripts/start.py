@@ -2,7 +2,11 @@
 AI Voice Studio - Startup Script
 Run this to install deps, build the frontend (if needed), and launch the app.
 """
-import subprocess
+# subprocess, threading and friends are imported where used: when everything
+# is already installed and built, the launcher goes straight to the backend
+import functools
+import hashlib
+import os
 import sys
 from pathlib import Path
 
@@ -10,87 +14,320 @@ PROJECT_ROOT = Path(__file__).parent.parent
 BACKEND_DIR = PROJECT_ROOT / "backend"
 FRONTEND_DIR = PROJECT_ROOT / "frontend"
 FRONTEND_DIST = FRONTEND_DIR / "dist"
-DEPS_MARKER = PROJECT_ROOT / "venv" / ".deps-installed"
+FRONTEND_LOCK = FRONTEND_DIR / "package-lock.json"
+# Build inputs outside src/ whose edits make dist/ stale
+FRONTEND_CONFIG_FILES = (
+    "index.html", "package.json", "package-lock.json",
+    "vite.config.ts", "vite.config.js",
+    "tsconfig.json", "tsconfig.app.json", "tsconfig.node.json",
+)
+# Digest of the package-lock.json node_modules was last installed from
+NODE_MODULES_MARKER = FRONTEND_DIR / "node_modules" / ".lock-hash"
 
+# Per-environment record of the last dependency install (see _req_digest),
+# keyed by interpreter prefix so switching between venvs/conda envs doesn't
+# reuse another env's marker. Kept in the project, never in sys.prefix itself
+_prefix_id = hashlib.sha256(os.path.realpath(sys.prefix).encode()).hexdigest()[:16]
+DEPS_MARKER = PROJECT_ROOT / ".cache" / f"deps-{_prefix_id}"
 
+# Created up front by main(), before any setup work
+REQUIRED_DIRS = (BACKEND_DIR / "data", DEPS_MARKER.parent)
+
+# Fully pinned, hashed requirements (pip-compile --generate-hashes
+# requirements.txt); used instead of requirements.txt when present
+REQUIREMENTS_LOCK = BACKEND_DIR / "requirements.lock"
+
+# Installed alongside requirements.txt (which already has soundfile);
+# optional, other engines work without it
+KOKORO_REQUIREMENTS = ["kokoro>=0.8"]
+
+PIP_INSTALL = [
+    sys.executable, "-m", "pip", "install",
+    "--prefer-binary", "--no-input", "--disable-pip-version-check",
+]
+
+
+# Set by setup(), where install_deps() and build_frontend() run side by side
+_print_lock = None
+
+
+def log(message: str) -> None:
+    """Print a whole line, even with another setup thread printing."""
+    if _print_lock is None:
+        print(message, flush=True)
+        return
+    with _print_lock:
+        print(message, flush=True)
+
+
+def _run_prefixed(cmd: list[str] | str, prefix: str, cwd: Path | None = None, check: bool = False) -> int:
+    """Run cmd, streaming its combined output line by line as "[prefix] ...".
+
+    Nothing is buffered beyond one line, and the prefix keeps pip and npm
+    output apart while they run concurrently. A string cmd runs through the
+    shell. Returns the exit code.
+    """
+    import subprocess
+
+    proc = subprocess.Popen(
+        cmd,
+        shell=isinstance(cmd, str),
+        cwd=str(cwd) if cwd else None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        errors="replace",
+        bufsize=1,
+    )
+    with proc.stdout:
+        for line in proc.stdout:
+            log(f"[{prefix}] {line.rstrip()}")
+    returncode = proc.wait()
+    if check and returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd)
+    return returncode
+
+
+@functools.lru_cache(maxsize=None)
 def check_node():
+    """Whether node is on PATH (a PATH lookup, no process spawn).
+
+    With AVS_CHECK_NODE_VERSION=1 it also runs node --version and requires 18+.
+    """
+    import shutil
+    import subprocess
+
+    node = shutil.which("node")
+    if node is None:
+        return False
+    if os.environ.get("AVS_CHECK_NODE_VERSION") != "1":
+        return True
+
+    result = subprocess.run([node, "--version"], capture_output=True, text=True)
     try:
-        subprocess.run(["node", "--version"], capture_output=True, check=True)
+        major = int(result.stdout.strip().lstrip("v").split(".")[0])
+    except ValueError:
+        log(f"[WARN] Could not parse Node.js version: {result.stdout.strip()!r}")
         return True
-    except FileNotFoundError:
+    if major < 18:
+        log(f"[ERROR] Node.js {result.stdout.strip()} found; 18+ is required.")
         return False
+    return True
+
+
+def _req_digest() -> str:
+    """SHA-256 of everything install_deps() installs; stored in DEPS_MARKER."""
+    h = hashlib.sha256()
+    h.update((BACKEND_DIR / "requirements.txt").read_bytes())
+    if REQUIREMENTS_LOCK.exists():
+        h.update(REQUIREMENTS_LOCK.read_bytes())
+    h.update("\n".join(KOKORO_REQUIREMENTS).encode())
+    return h.hexdigest()
+
+
+def _deps_current(digest: str) -> bool:
+    return DEPS_MARKER.exists() and DEPS_MARKER.read_text().strip() == digest
 
 
 def install_deps():
-    """Install Python dependencies if not already done."""
-    if DEPS_MARKER.exists():
-        print("[OK] Python dependencies already installed.")
+    """Install Python dependencies unless they match the last install."""
+    digest = _req_digest()
+    if _deps_current(digest):
+        log("[OK] Python dependencies already installed.")
         return
 
-    print("[SETUP] Installing Python dependencies...")
-    subprocess.run(
-        [sys.executable, "-m", "pip", "install", "-r",
-         str(BACKEND_DIR / "requirements.txt"), "--quiet"],
+    # wheel lets pip cache built wheels, so a reinstall skips compiling sdists.
+    # Only an optimization: offline, behind a proxy or in a pinned env the
+    # existing pip still installs the requirements below
+    if _run_prefixed(PIP_INSTALL + ["-U", "pip", "wheel"], "pip") != 0:
+        log("[WARN] Could not upgrade pip/wheel - installing with the current pip.")
+
+    log("[SETUP] Installing Python dependencies...")
+    if REQUIREMENTS_LOCK.exists():
+        _install_from_lock()
+    else:
+        _install_from_requirements()
+
+    DEPS_MARKER.write_text(digest)
+    log("[OK] Python dependencies installed.")
+
+
+def _install_from_lock():
+    """Install the pinned lockfile, then Kokoro on top of it.
+
+    Every package is pinned and hashed, so pip skips resolution for the base
+    set. Hash-checking mode covers a whole pip run, so the unpinned Kokoro
+    add-on needs a run of its own.
+    """
+    _run_prefixed(
+        PIP_INSTALL + ["--require-hashes", "--no-deps", "-r", str(REQUIREMENTS_LOCK)],
+        "pip",
         check=True,
     )
+    if _run_prefixed(PIP_INSTALL + KOKORO_REQUIREMENTS, "pip") != 0:
+        log("[WARN] Kokoro install failed - other engines will still work.")
+
 
-    print("[SETUP] Installing Kokoro TTS engine...")
-    result = subprocess.run(
-        [sys.executable, "-m", "pip", "install", "kokoro>=0.8", "soundfile", "--quiet"],
+def _install_from_requirements():
+    """requirements.txt and Kokoro in one resolver pass; Kokoro is non-fatal."""
+    returncode = _run_prefixed(
+        PIP_INSTALL + ["-r", str(BACKEND_DIR / "requirements.txt"), *KOKORO_REQUIREMENTS],
+        "pip",
     )
-    if result.returncode != 0:
-        print("[WARN] Kokoro install failed - other engines will still work.")
 
-    DEPS_MARKER.parent.mkdir(parents=True, exist_ok=True)
-    DEPS_MARKER.write_text("done")
-    print("[OK] Python dependencies installed.")
+    if returncode != 0:
+        # Kokoro is the optional part; retry without it before giving up
+        log("[WARN] Combined install failed, retrying without Kokoro...")
+        _run_prefixed(
+            PIP_INSTALL + ["-r", str(BACKEND_DIR / "requirements.txt")],
+            "pip",
+            check=True,
+        )
+        log("[WARN] Kokoro install failed - other engines will still work.")
+
+
+def precompile_backend():
+    """Byte-compile the backend on all cores so its first import skips parsing.
+
+    Already-current .pyc files are left alone, so warm runs cost one stat per
+    module. backend/data holds models and downloads, not backend code.
+    """
+    import re
+
+    _run_prefixed(
+        [sys.executable, "-m", "compileall", "-q", "-j", "0",
+         "-x", re.escape(str(BACKEND_DIR / "data")), str(BACKEND_DIR)],
+        "compileall",
+    )
+
+
+def _frontend_install_step() -> tuple[str | None, str | None]:
+    """Shell command installing frontend deps (None if current) and the lock digest to record."""
+    if not FRONTEND_LOCK.exists():
+        return "npm install", None
+
+    lock_hash = hashlib.sha256(FRONTEND_LOCK.read_bytes()).hexdigest()
+    if NODE_MODULES_MARKER.exists() and NODE_MODULES_MARKER.read_text().strip() == lock_hash:
+        log("[OK] Frontend dependencies already installed.")
+        return None, None
+    # ci installs the lockfile as-is: no resolver pass, no audit/fund requests
+    return "npm ci --prefer-offline --no-audit --no-fund", lock_hash
+
+
+def _dist_fresh() -> bool:
+    """True if dist/index.html is newer than every frontend source and config file."""
+    try:
+        built = (FRONTEND_DIST / "index.html").stat().st_mtime
+    except FileNotFoundError:
+        return False
+
+    newest = 0.0
+    for name in FRONTEND_CONFIG_FILES:
+        try:
+            newest = max(newest, (FRONTEND_DIR / name).stat().st_mtime)
+        except FileNotFoundError:
+            pass
+    for root, _dirs, files in os.walk(FRONTEND_DIR / "src"):
+        for name in files:
+            newest = max(newest, os.stat(os.path.join(root, name)).st_mtime)
+    return built >= newest
+
+
+def _skip_frontend() -> bool:
+    return os.environ.get("AVS_SKIP_FRONTEND") == "1"
 
 
 def build_frontend():
-    if FRONTEND_DIST.exists() and (FRONTEND_DIST / "index.html").exists():
-        print("[OK] Frontend already built.")
+    if _skip_frontend():
+        log("[SKIP] Frontend build skipped (AVS_SKIP_FRONTEND=1); API at http://localhost:8765/api")
+        return True
+
+    if _dist_fresh():
+        log("[OK] Frontend already built.")
         return True
 
     if not check_node():
-        print("[ERROR] Node.js not found. Install Node.js 18+ to build the frontend.")
+        log("[ERROR] Node.js not found. Install Node.js 18+ to build the frontend.")
         return False
 
-    print("[BUILD] Installing frontend dependencies...")
-    subprocess.run(["npm", "install"], cwd=str(FRONTEND_DIR), check=True)
-
-    print("[BUILD] Building frontend...")
-    subprocess.run(["npm", "run", "build"], cwd=str(FRONTEND_DIR), check=True)
+    install, lock_hash = _frontend_install_step()
+    if install:
+        log("[BUILD] Installing frontend dependencies and building...")
+    else:
+        log("[BUILD] Building frontend...")
+    # One shell line for both steps; the shell also resolves npm.cmd on Windows
+    _run_prefixed(
+        " && ".join(filter(None, [install, "npm run build"])),
+        "npm",
+        cwd=FRONTEND_DIR,
+        check=True,
+    )
+    if lock_hash:
+        NODE_MODULES_MARKER.write_text(lock_hash)
 
-    print("[OK] Frontend built successfully.")
+    log("[OK] Frontend built successfully.")
     return True
 
 
+def _ensure_dirs():
+    for d in REQUIRED_DIRS:
+        d.mkdir(parents=True, exist_ok=True)
+
+
+def setup() -> bool:
+    """Install/build whatever is stale. Returns whether the frontend is usable."""
+    global _print_lock
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    _print_lock = threading.Lock()
+    # Python deps and the frontend build touch disjoint trees; overlap them
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        deps = pool.submit(lambda: (install_deps(), precompile_backend()))
+        frontend = pool.submit(build_frontend)
+        deps.result()
+        return frontend.result()
+
+
 def main():
     print("=" * 50)
     print("  AI Voice Studio")
+    print("  (AVS_SKIP_FRONTEND=1: API only, AVS_NO_BROWSER=1: headless)")
     print("=" * 50)
     print()
 
-    # Install Python deps
-    install_deps()
+    _ensure_dirs()
 
-    # Build frontend if needed
-    if not build_frontend():
+    if _deps_current(_req_digest()) and (_skip_frontend() or _dist_fresh()):
+        print("[OK] Dependencies and frontend are up to date.")
+        frontend_ok = True
+    else:
+        frontend_ok = setup()
+
+    if not frontend_ok:
         print("\nFrontend build failed. You can still use the API at http://localhost:8765/api/health")
         print()
 
-    # Ensure backend data directories exist
-    (BACKEND_DIR / "data").mkdir(exist_ok=True)
-
     # Launch backend
     print("[START] Launching backend server...")
-    print("[INFO] Opening browser at http://localhost:8765")
+    # The backend opens the browser itself once /api/health answers
+    if os.environ.get("AVS_NO_BROWSER") == "1":
+        print("[INFO] Open http://localhost:8765 in your browser")
+    else:
+        print("[INFO] Opening browser at http://localhost:8765")
     print("[INFO] Press Ctrl+C to stop\n")
 
-    subprocess.run(
-        [sys.executable, str(BACKEND_DIR / "main.py")],
-        cwd=str(BACKEND_DIR),
-    )
+    backend = [sys.executable, str(BACKEND_DIR / "main.py")]
+    if sys.platform == "win32":
+        # exec on Windows spawns a new process and detaches it from the console
+        import subprocess
+        subprocess.run(backend, cwd=str(BACKEND_DIR))
+        return
+
+    # Become the backend: no idle launcher process, Ctrl+C goes straight to it
+    sys.stdout.flush()
+    os.chdir(BACKEND_DIR)
+    os.execv(sys.executable, backend)
 
 
 if __name__ == "__main__":